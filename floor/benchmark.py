@@ -0,0 +1,266 @@
+'''
+---
+title: Floor Parser Benchmark
+---
+
+Times `congressionalrecordparser.parse` over one or more govinfo records (a `CREC-YYYY-MM-DD.zip`, or the extracted `CREC-YYYY-MM-DD/` directory holding `mods.xml` and `html/`), and checks its output against golden fixtures
+
+- `total` is the full per-file time (metadata lookup + reading + line parsing)
+- `content` is just `ParseCRFile.parse` (reading the granule and classifying its lines)
+- throughput is reported as granules/sec and lines/sec (of granule text), along with the process's peak RSS
+- `--workers N` also times `parse(..., workers = N)` and checks that it produces exactly what the serial parse does
+- `--check-pre` also reads every granule's `<pre>` text both ways, with the lxml reader `read_htm_file` uses (`congressionalrecordparser.pre_text`) and with the BeautifulSoup extraction it replaced (`BeautifulSoup(htm, "lxml").pre.text`), checks the two agree line for line, and times each (needs bs4)
+
+With no records given, it runs over the (synthetic) sample records in `samples/` and compares every granule's parse (header, speeches, speakers, bioguide ids, ...) against `samples/golden/<record>.jsonl`, exiting non-zero on any difference; so it can gate parser changes offline. Run with `--update-golden` to rewrite the fixtures after an intended change to the parser's output (and commit them with it).
+
+The fixtures in the repo were written by the baseline parser (the repo's first commit), not the one being checked: `--update-golden --golden-ref REV` writes them with the parser as of git revision REV (extracting zips to a temporary directory first, since the old parser only reads directories). See samples/trim.py for adding a (trimmed) real record.
+
+usage: python benchmark.py [path/to/CREC-YYYY-MM-DD[.zip] ...] [--repeat N] [--workers N] [--check-pre] [--update-golden [--golden-ref $(git rev-list --max-parents=0 HEAD)]]
+'''
+# Python Standard Library
+import os, sys, json, glob, types, zipfile, argparse, warnings, logging, resource, statistics, subprocess, tempfile, time
+
+# Internal Resources
+import congressionalrecordparser
+
+samples_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'samples')
+golden_dir = os.path.join(samples_dir, 'golden')
+
+
+def time_package(cr_dir):
+    '''
+    Parse every granule in `cr_dir`, returning a list of (access_path, total seconds, content seconds, lines)
+    '''
+    content_times, line_counts = {}, {}
+    file_parse = congressionalrecordparser.ParseCRFile.parse
+    file_iter_lines = congressionalrecordparser.iter_lines
+
+    def timed_parse(crfile):
+        start = time.perf_counter()
+        file_parse(crfile)
+        content_times[crfile.access_path] = time.perf_counter() - start
+
+    def counted_iter_lines(text):
+        counted_iter_lines.lines = text.count('\n') + 1
+        return file_iter_lines(text)
+
+    congressionalrecordparser.ParseCRFile.parse = timed_parse
+    congressionalrecordparser.iter_lines = counted_iter_lines
+    try:
+        timings = []
+        crfiles = congressionalrecordparser.parse(cr_dir)
+        while True:
+            start = time.perf_counter()
+            crfile = next(crfiles, None)
+            if crfile is None:
+                break
+            timings.append((crfile.access_path, time.perf_counter() - start, content_times[crfile.access_path], counted_iter_lines.lines))
+    finally:
+        congressionalrecordparser.ParseCRFile.parse = file_parse
+        congressionalrecordparser.iter_lines = file_iter_lines
+    return timings
+
+
+def parsed_output(crfiles):
+    '''
+    The parts of each parsed file that ingestor.py uses
+    '''
+    return [(crfile.access_path, crfile.chamber, crfile.cr_vol, crfile.cr_num, crfile.crdoc) for crfile in crfiles]
+
+
+def check_parallel(cr_dir, workers):
+    '''
+    Time a parallel parse of `cr_dir` and make sure it matches the serial one (raises AssertionError if not)
+    '''
+    serial = parsed_output(congressionalrecordparser.parse(cr_dir))
+    start = time.perf_counter()
+    parallel = parsed_output(congressionalrecordparser.parse(cr_dir, workers = workers))
+    elapsed = time.perf_counter() - start
+    assert [p[0] for p in parallel] == [s[0] for s in serial], 'parallel parse returned granules in a different order'
+    for s, p in zip(serial, parallel):
+        assert s == p, f'parallel parse differs from serial parse for {s[0]}'
+    return elapsed
+
+
+def bs4_pre_lines(htm):
+    ''' How read_htm_file got a granule's lines before it used lxml directly '''
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(htm, 'lxml').pre.text.split('\n')
+
+
+def lxml_pre_lines(htm):
+    return list(congressionalrecordparser.iter_lines(congressionalrecordparser.pre_text(htm)))
+
+
+def check_pre(cr_dir, repeat = 3):
+    '''
+    Read every granule's <pre> lines with lxml and with BeautifulSoup; returns (lxml seconds, bs4 seconds, granules, lines, differences), timings being the fastest of `repeat` runs over all the granules
+    '''
+    cr_parser = congressionalrecordparser.ParseCRDir(cr_dir)
+    pages = {}
+    for path in cr_parser.granule_paths():
+        with cr_parser.open(path) as f:
+            pages[path] = f.read().decode('utf-8')
+
+    timings = {}
+    for name, read in (('lxml', lxml_pre_lines), ('bs4', bs4_pre_lines)):
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            lines = {path: read(htm) for path, htm in pages.items()}
+            runs.append(time.perf_counter() - start)
+        timings[name] = (min(runs), lines)
+
+    differences = []
+    lxml_lines, bs4_lines = timings['lxml'][1], timings['bs4'][1]
+    for path in pages:
+        got, want = lxml_lines[path], bs4_lines[path]
+        if len(got) != len(want):
+            differences.append(f'{path}: {len(got)} lines != {len(want)}')
+        for i, (g, w) in enumerate(zip(got, want)):
+            if g != w:
+                differences.append(f'{path}: line {i} {g!r} != {w!r}')
+                break
+    return timings['lxml'][0], timings['bs4'][0], len(pages), sum(len(lines) for lines in bs4_lines.values()), differences
+
+
+def record_name(cr_dir):
+    return os.path.basename(os.path.normpath(cr_dir)).split('.')[0]
+
+
+def golden_path(cr_dir):
+    return os.path.join(golden_dir, f'{record_name(cr_dir)}.jsonl')
+
+
+def parser_at(ref):
+    '''
+    congressionalrecordparser as of git revision `ref`, loaded as a module of its own
+    '''
+    here = os.path.dirname(os.path.abspath(__file__))
+    root = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd = here, capture_output = True, text = True, check = True).stdout.strip()
+    path = os.path.relpath(os.path.abspath(congressionalrecordparser.__file__), root).replace(os.sep, '/')
+    source = subprocess.run(['git', 'show', f'{ref}:{path}'], cwd = here, capture_output = True, text = True, check = True).stdout
+    module = types.ModuleType(f'congressionalrecordparser_{ref}')
+    module.__file__ = f'{ref}:{path}'
+    exec(compile(source, module.__file__, 'exec'), module.__dict__)
+    return module
+
+
+def parse_with(parser, cr_dir):
+    '''
+    parser.parse(cr_dir), in filename order; zips are extracted first for parsers that can only read a directory
+    '''
+    if parser is congressionalrecordparser:
+        return sorted(parser.parse(cr_dir), key = lambda crfile: os.path.basename(crfile.filepath))
+    warnings.filterwarnings('ignore', module = parser.__name__) # <-- e.g. bs4's XMLParsedAsHTMLWarning, from the baseline parser
+    if os.path.isdir(cr_dir):
+        return sorted(parser.parse(cr_dir), key = lambda crfile: os.path.basename(crfile.filepath))
+    with tempfile.TemporaryDirectory() as tmp, zipfile.ZipFile(cr_dir) as zf:
+        zf.extractall(tmp)
+        mods = min((name for name in zf.namelist() if os.path.basename(name) == 'mods.xml'), key = len)
+        return sorted(parser.parse(os.path.join(tmp, os.path.dirname(mods))), key = lambda crfile: os.path.basename(crfile.filepath))
+
+
+def golden_output(cr_dir, parser = congressionalrecordparser):
+    '''
+    One json line per granule (in filename order), as stored in the golden fixtures
+    '''
+    return [
+        json.dumps({'access_path': access_path, 'chamber': chamber, 'cr_vol': cr_vol, 'cr_num': cr_num, 'crdoc': crdoc}, sort_keys = True, ensure_ascii = False) + '\n'
+        for access_path, chamber, cr_vol, cr_num, crdoc in parsed_output(parse_with(parser, cr_dir))
+    ]
+
+
+def write_golden(cr_dir, parser = congressionalrecordparser):
+    os.makedirs(golden_dir, exist_ok = True)
+    with open(golden_path(cr_dir), 'w', encoding = 'utf-8') as f:
+        f.writelines(golden_output(cr_dir, parser))
+
+
+def check_golden(cr_dir):
+    '''
+    Compare a parse of `cr_dir` against its golden fixture; returns a list of differences (empty if it matches)
+    '''
+    with open(golden_path(cr_dir), encoding = 'utf-8') as f:
+        expected = dict((granule['access_path'], granule) for granule in map(json.loads, f))
+    produced = dict((granule['access_path'], granule) for granule in map(json.loads, golden_output(cr_dir)))
+
+    differences = [f'{access_path}: missing from the parse' for access_path in expected if access_path not in produced]
+    differences += [f'{access_path}: not in the fixture' for access_path in produced if access_path not in expected]
+    for access_path in expected.keys() & produced.keys():
+        want, got = expected[access_path], produced[access_path]
+        for field in ('chamber', 'cr_vol', 'cr_num'):
+            if want[field] != got[field]:
+                differences.append(f'{access_path}: {field} {got[field]!r} != {want[field]!r}')
+        want_speeches, got_speeches = want['crdoc'].pop('content'), got['crdoc'].pop('content')
+        if len(want_speeches) != len(got_speeches):
+            differences.append(f'{access_path}: {len(got_speeches)} items != {len(want_speeches)}')
+        for i, (want_speech, got_speech) in enumerate(zip(want_speeches, got_speeches)):
+            for field in sorted(want_speech.keys() | got_speech.keys()):
+                if want_speech.get(field) != got_speech.get(field):
+                    differences.append(f'{access_path}: item {i} {field} {got_speech.get(field)!r} != {want_speech.get(field)!r}')
+        if want['crdoc'] != got['crdoc']:
+            differences.append(f'{access_path}: header/metadata differs')
+    return sorted(differences)
+
+
+def peak_rss_mb(who = resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024 # <-- kilobytes on linux
+
+
+def report(label, seconds):
+    ms = [s * 1000 for s in seconds]
+    print(f'\t{label:<8} total {sum(ms):9.1f} ms | mean {statistics.mean(ms):7.2f} ms | median {statistics.median(ms):7.2f} ms | max {max(ms):7.2f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Time congressionalrecordparser.parse per granule, and check it against the golden fixtures')
+    parser.add_argument('cr_dirs', nargs = '*', help = 'record zips or extracted CREC-YYYY-MM-DD directories; default: the records in samples/')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'number of runs per package; the fastest run is reported')
+    parser.add_argument('--workers', type = int, default = None, help = 'also time (and check) a parallel parse with this many processes')
+    parser.add_argument('--check-pre', action = 'store_true', help = "also check (and time) the lxml <pre> reader against the BeautifulSoup one it replaced")
+    parser.add_argument('--update-golden', action = 'store_true', help = 'rewrite the golden fixtures for these records instead of checking against them')
+    parser.add_argument('--golden-ref', default = None, help = "with --update-golden: write the fixtures with the parser as of this git revision (e.g. the baseline, `git rev-list --max-parents=0 HEAD`) rather than the current one; default: None")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING) # <-- the parser warns about every granule without a vol/num
+    golden_parser = parser_at(args.golden_ref) if args.golden_ref else congressionalrecordparser
+
+    cr_dirs = args.cr_dirs or sorted(glob.glob(os.path.join(samples_dir, 'CREC-*.zip')))
+    failed = False
+    for cr_dir in cr_dirs:
+        runs = [time_package(cr_dir) for _ in range(args.repeat)]
+        best = min(runs, key = lambda run: sum(t[1] for t in run))
+        seconds, lines = sum(t[1] for t in best), sum(t[3] for t in best)
+        print(f'{cr_dir}: {len(best)} granules, {lines} lines (best of {args.repeat})')
+        report('total', [t[1] for t in best])
+        report('content', [t[2] for t in best])
+        print(f'\tthroughput {len(best) / seconds:9.1f} granules/sec | {lines / seconds:11.1f} lines/sec | peak rss {peak_rss_mb():7.1f} MB')
+        if args.workers:
+            elapsed = check_parallel(cr_dir, args.workers)
+            print(f'\tparallel ({args.workers} workers) total {elapsed * 1000:9.1f} ms | {len(best) / elapsed:9.1f} granules/sec | peak worker rss {peak_rss_mb(resource.RUSAGE_CHILDREN):7.1f} MB | output matches serial parse')
+
+        if args.check_pre:
+            lxml_seconds, bs4_seconds, granules, lines, differences = check_pre(cr_dir, args.repeat)
+            print(f'\t<pre>    lxml {lxml_seconds * 1000:9.1f} ms | bs4 {bs4_seconds * 1000:9.1f} ms | {bs4_seconds / lxml_seconds:5.1f}x | {granules} granules, {lines} lines')
+            if differences:
+                failed = True
+                print(f'\t<pre>: {len(differences)} granules differ from the BeautifulSoup extraction')
+                for difference in differences[:20]:
+                    print(f'\t\t{difference}')
+            else:
+                print('\t<pre>: lxml lines match BeautifulSoup line for line')
+
+        if args.update_golden:
+            write_golden(cr_dir, golden_parser)
+            print(f'\tgolden: wrote {golden_path(cr_dir)}' + (f' (with the parser as of {args.golden_ref})' if args.golden_ref else ''))
+        elif os.path.exists(golden_path(cr_dir)):
+            differences = check_golden(cr_dir)
+            if differences:
+                failed = True
+                print(f'\tgolden: {len(differences)} differences from {golden_path(cr_dir)}')
+                for difference in differences[:20]:
+                    print(f'\t\t{difference}')
+            else:
+                print('\tgolden: output matches')
+
+    sys.exit(1 if failed else 0)
@@ -69,58 +69,157 @@ SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 '''
 from __future__ import absolute_import
 from builtins import object
-from bs4 import BeautifulSoup
-from io import StringIO, BytesIO
+from io import StringIO, BytesIO, TextIOWrapper
 import os
+import posixpath
+import zipfile
 from datetime import datetime
 import re
 import xml.etree.cElementTree as ET
 import logging
 import itertools
+import functools
+import collections
+import concurrent.futures
+from lxml import etree
+import lxml.html
+
+def local_name(elem):
+    ''' Tag name without the mods namespace, lowercased '''
+    return etree.QName(elem).localname.lower()
+
+def lower_attrs(elem):
+    return dict((key.lower(), value) for key, value in elem.attrib.items())
+
+def iter_lines(text):
+    ''' Same lines as text.split('\\n'), one at a time '''
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def pre_text(htm):
+    ''' The text of a granule's <pre> block (entities unescaped), or None if
+    it has none; all we want from the page, so no full soup is built '''
+    pre = next(lxml.html.document_fromstring(htm).iter('pre'), None)
+    if pre is None:
+        return None
+    return ''.join(pre.itertext())
+
+def find_name(elem, name_type):
+    ''' First <name type="name_type"> under elem (or None) '''
+    for name in elem.iter('{*}name'):
+        if name.get('type') == name_type:
+            return name
+
+class LineClassifier(object):
+    """
+    Every pattern in ParseCRFile.item_types, compiled once into a single
+    alternation so that a line is classified with one regex match instead
+    of a re.match per pattern.
+
+    Each pattern becomes its own outer named group, in the same order as
+    item_types (so the first pattern to match still wins), and any named
+    groups inside a pattern get a per-alternative suffix so they don't
+    collide. Since the outer group is the last to close, match.lastgroup
+    tells us which pattern matched.
+
+    Patterns that don't break the flow (metacharacters, empty_line) can't
+    also match a break pattern, so the kind of the first match is enough
+    to decide between break and skip.
+    """
+    re_group_name = re.compile(r'\(\?P<(\w+)>')
+
+    def __init__(self, item_types, re_newspeaker):
+        self.groups = {}
+        alternatives = []
+        for k, (kind, params) in enumerate(item_types.items()):
+            # speech patterns are per-file; see make_re_newspeaker
+            patterns = [re_newspeaker] if kind == 'speech' else params['patterns']
+            for p, pat in enumerate(patterns):
+                suffix = '_{0}_{1}'.format(k, p)
+                group = 'item' + suffix
+                alternatives.append('(?P<{0}>{1})'.format(group,
+                    self.re_group_name.sub(r'(?P<\1' + suffix + '>', pat)))
+                speaker_group = None
+                if params['speaker_re']:
+                    speaker_group = params['speaker_group'] + suffix
+                self.groups[group] = (kind, params, speaker_group)
+        self.matcher = re.compile('|'.join(alternatives))
+        self.re_newspeaker = re_newspeaker
+
+    def classify(self, line):
+        """
+        Returns (kind, params, speaker) for the first matching pattern,
+        or None if nothing matches. speaker is None unless the kind
+        pulls its speaker from the line.
+        """
+        amatch = self.matcher.match(line)
+        if amatch is None:
+            return None
+        kind, params, speaker_group = self.groups[amatch.lastgroup]
+        if speaker_group:
+            return kind, params, amatch.group(speaker_group)
+        return kind, params, None
 
-class crItem(object):
-    
-    def is_break(self,line):
-        for pat in self.parent.item_breakers:
-            if re.match(pat,line):
-                return True
 
-    def is_skip(self,line):
-        for pat in self.parent.skip_items:
-            if re.match(pat,line):
-                return True
+@functools.lru_cache(maxsize = 256)
+def speaker_classifier(speaking_names):
+    """
+    The LineClassifier for a frozenset of speaker names. The same sets of
+    speakers come up over and over across a day's granules, so each
+    (huge) speaker alternation is only compiled once per process.
+    """
+    return LineClassifier(ParseCRFile.item_types,
+                          ParseCRFile.make_re_newspeaker(speaking_names))
+
+
+class SpeakerResolver(object):
+    """
+    Resolves the speaker names matched in the text to bioguide ids with a
+    dict lookup, and counts the speeches whose speaker it couldn't
+    resolve (by name, e.g. The PRESIDING OFFICER) in self.unresolved.
+    """
+
+    def __init__(self, speakers):
+        self.bioguide_ids = dict((name, person['bioguideid'])
+                                 for name, person in speakers.items())
+        self.unresolved = collections.Counter()
+
+    def resolve(self, name):
+        bioguide_id = self.bioguide_ids.get(name)
+        if bioguide_id is None or bioguide_id == 'None':
+            self.unresolved[name] += 1
+        return bioguide_id
+
+
+class crItem(object):
 
     def item_builder(self):
         parent = self.parent
         if parent.lines_remaining == False:
             logging.info("Reached end of document.")
             return
-        item_types = parent.item_types
         content = [parent.cur_line]
         # What is this line
-        for kind,params in list(item_types.items()):
-            for pat in params['patterns']:
-                amatch = re.match(pat,parent.cur_line)
-                if amatch:
-                    self.item['kind'] = kind
-                    #if params['special_case']:
-                    #    self.item['flag'] = params['condition']
-                    #else:
-                    #    self.item['flag'] = False
-                    if params['speaker_re']:
-                        them = amatch.group(params['speaker_group'])
-                        self.item['speaker'] = them
-                        if them in list(self.parent.speakers.keys()):
-                            self.item['speaker_bioguide'] = \
-                              self.parent.speakers[them]['bioguideid']
-                        else:
-                            self.item['speaker_bioguide'] = None
-                    else:
-                        self.item['speaker'] = params['speaker']
-                        self.item['speaker_bioguide'] = None
-                    break
-            if amatch:
-                break
+        line_type = parent.classifier.classify(parent.cur_line)
+        if line_type:
+            kind, params, them = line_type
+            self.item['kind'] = kind
+            #if params['special_case']:
+            #    self.item['flag'] = params['condition']
+            #else:
+            #    self.item['flag'] = False
+            if params['speaker_re']:
+                self.item['speaker'] = them
+                self.item['speaker_bioguide'] = parent.resolver.resolve(them)
+            else:
+                self.item['speaker'] = params['speaker']
+                self.item['speaker_bioguide'] = None
         # OK so now put everything else in with it
         # that doesn't interrupt an item
         # conditional logic for edge cases goes here.
@@ -128,12 +227,12 @@ class crItem(object):
         #    pass
         #else:
         for line in parent.the_text:
-            if self.is_break(line):
-                break
-            elif self.is_skip(line):
-                pass
-            else:
+            line_type = parent.classifier.classify(line)
+            if line_type is None:
                 content.append(line)
+            elif line_type[1]['break_flow']:
+                break
+            # otherwise it's a skip item
         # The original text was split on newline, so ...
         item_text = '\n'.join(content)
         self.item['text'] = item_text
@@ -153,19 +252,155 @@ class crItem(object):
 
 
 class ParseCRDir(object):
-    
+
     def gen_dir_metadata(self):
         ''' Load up all metadata for this directory
-         from the mods file.'''
-        with open(self.mods_path,'r') as mods_file:
-            self.mods = BeautifulSoup(mods_file,"lxml")
-        
+         from the mods file.
+
+         mods.xml is streamed once and boiled down to a dict of
+         accessId -> granule metadata, so each ParseCRFile does a
+         lookup instead of searching the whole tree.'''
+        self.mods_index = {}
+        with self.open(self.mods_path) as mods_file:
+            for event, elem in etree.iterparse(mods_file, events=('end',),
+                                               tag=('{*}extension','{*}relatedItem')):
+                if local_name(elem) == 'extension':
+                    granule = self.index_granule(elem)
+                    if granule['accessid'] is not None:
+                        self.mods_index.setdefault(granule['accessid'], granule)
+                else:
+                    # Done with this granule; drop it (and anything
+                    # before it) so we never hold the whole tree
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del elem.getparent()[0]
+
+    def index_granule(self, extension):
+        ''' Everything ParseCRFile needs from one <extension> block.
+        Tags and attribute names are lowercased so the lookups behave
+        the same as the old (html-parser) BeautifulSoup ones.'''
+        granule = {'accessid':None,
+                   'speakers':{},
+                   'related_bills':[],
+                   'related_laws':[],
+                   'related_usc':[],
+                   'related_statute':[],
+                   }
+        for el in extension.iter(etree.Element):
+            tag = local_name(el)
+            if tag == 'accessid':
+                if el.getparent() is extension and granule['accessid'] is None:
+                    granule['accessid'] = el.text
+            elif tag in ('searchtitle','granuleclass'):
+                granule.setdefault(tag, el.text)
+            elif tag == 'time':
+                granule.setdefault(tag, lower_attrs(el))
+            elif tag == 'congmember':
+                name = find_name(el, 'parsed')
+                if name is not None:
+                    granule['speakers'][name.text] = self.people_helper(el)
+            elif tag == 'bill':
+                granule['related_bills'].append(lower_attrs(el))
+            elif tag == 'law':
+                granule['related_laws'].append(lower_attrs(el))
+            elif tag == 'uscode':
+                title = lower_attrs(el).get('title')
+                granule['related_usc'].extend(
+                    [dict([('title',title)] + list(lower_attrs(sec).items()))
+                     for sec in el.iter('{*}section')])
+            elif tag == 'statuteatlarge':
+                volume = lower_attrs(el).get('volume')
+                granule['related_statute'].extend(
+                    [dict([('volume',volume)] + list(lower_attrs(pg).items()))
+                     for pg in el.iter('{*}pages')])
+        return granule
+
+    def people_helper(self,tagobject):
+        attrs = lower_attrs(tagobject)
+        output_dict = {}
+        output_dict['bioguideid'] = attrs.get('bioguideid','None')
+        for key in ['chamber','congress','party','state','role']:
+            output_dict[key] = attrs.get(key,'None')
+        name_full = find_name(tagobject, 'authority-fnf')
+        if name_full is not None:
+            output_dict['name_full'] = name_full.text
+        else:
+            output_dict['name_full'] = 'None'
+        return output_dict
+
+    # Reading the record (either extracted on disk, or straight out of its zip)
+
+    def open(self, path):
+        ''' Binary file object for a file in the record '''
+        if self.zip_source is None:
+            return open(path,'rb')
+        return self.zip_file().open(path)
+
+    def zip_file(self):
+        # opened lazily so that a ParseCRDir can be pickled (see __getstate__)
+        if self._zip is None:
+            source = self.zip_source
+            if isinstance(source, bytes):
+                source = BytesIO(source)
+            self._zip = zipfile.ZipFile(source)
+        return self._zip
+
+    def zip_root(self):
+        ''' The record directory inside the zip (whichever holds mods.xml) '''
+        roots = [posixpath.dirname(name) for name in self.zip_file().namelist()
+                 if posixpath.basename(name) == 'mods.xml']
+        if len(roots) == 0:
+            raise RuntimeError("{} doesn't have a mods.xml".format(self.zip_file().filename))
+        return min(roots, key=len)
+
+    def granule_paths(self):
+        ''' Sorted paths of the html granules we parse (skipping the
+        daily digest, front matter, and unpaged files) '''
+        if self.zip_source is None:
+            files = os.listdir(self.html_path)
+        else:
+            prefix = self.html_path + '/'
+            files = [name[len(prefix):] for name in self.zip_file().namelist()
+                     if name.startswith(prefix) and name != prefix]
+        paths = []
+        for file in sorted(files):
+            parse_path = self.join(self.html_path, file)
+            if any((
+                '-PgD' in parse_path,
+                'FrontMatter' in parse_path,
+                '-Pgnull' in parse_path)):
+                pass
+                # logging.info('Skipping {}'.format(parse_path))
+            else:
+                paths.append(parse_path)
+        return paths
+
+    def join(self, *parts):
+        # zip member names always use forward slashes
+        if self.zip_source is None:
+            return os.path.join(*parts)
+        return posixpath.join(*parts)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_zip'] = None
+        return state
+
     def __init__(self, abspath, **kwargs):
-        
+        '''
+        abspath: an extracted record directory, or the record's zip from
+        govinfo (a path to it, or its contents as bytes)
+        '''
         # dir data
-        self.cr_dir = abspath
-        self.mods_path = os.path.join(self.cr_dir,'mods.xml')
-        self.html_path = os.path.join(self.cr_dir,'html')
+        self.zip_source = None
+        self._zip = None
+        if isinstance(abspath, bytes) or not os.path.isdir(abspath):
+            self.zip_source = abspath
+            self.cr_dir = self.zip_root()
+        else:
+            self.cr_dir = abspath
+        self.mods_path = self.join(self.cr_dir,'mods.xml')
+        self.html_path = self.join(self.cr_dir,'html')
         self.gen_dir_metadata()
 
 
@@ -249,83 +484,46 @@ class ParseCRFile(object):
         self.num_titles += 1
         return id_num
         
-    def make_re_newspeaker(self):
-        speaker_list = '|'.join([mbr for mbr in list(self.speakers.keys()) \
-        if self.speakers[mbr]['role'] == 'SPEAKING'])
+    def speaking_names(self):
+        return frozenset(mbr for mbr, person in self.speakers.items()
+                         if person['role'] == 'SPEAKING')
+
+    @staticmethod
+    def make_re_newspeaker(speaking_names):
+        # Longest names first so a name can't cut off a longer one it's a
+        # prefix of (and so the pattern only depends on the set of names)
+        speaker_list = '|'.join(sorted(speaking_names,
+                                       key=lambda mbr: (-len(mbr), mbr)))
         if len(speaker_list) > 0:
             re_speakers = r'^(\s{1,2}|<bullet>)(?P<name>((' + speaker_list + ')|(((Mr)|(Ms)|(Mrs)|(Miss))\. (([-A-Z\'])(\s)?)+( of [A-Z][a-z]+)?)|(((The ((VICE|ACTING|Acting) )?(PRESIDENT|SPEAKER|CHAIR(MAN)?)( pro tempore)?)|(The PRESIDING OFFICER)|(The CLERK)|(The CHIEF JUSTICE)|(The VICE PRESIDENT)|(Mr\. Counsel [A-Z]+))( \([A-Za-z.\- ]+\))?)))\.'
         else:
             re_speakers = r'^(\s{1,2}|<bullet>)(?P<name>((((Mr)|(Ms)|(Mrs)|(Miss))\. (([-A-Z\'])(\s)?)+( of [A-Z][a-z]+)?)|((The ((VICE|ACTING|Acting) )?(PRESIDENT|SPEAKER|CHAIR(MAN)?)( pro tempore)?)|(The PRESIDING OFFICER)|(The CLERK)|(The CHIEF JUSTICE)|(The VICE PRESIDENT)|(Mr\. Counsel [A-Z]+))( \([A-Za-z.\- ]+\))?))\.'
         return re_speakers
     
-    def people_helper(self,tagobject):
-        output_dict = {}
-        if 'bioguideid' in tagobject.attrs:
-            output_dict['bioguideid'] = tagobject['bioguideid']
-        elif 'bioGuideId' in tagobject.attrs:
-            output_dict['bioguideid'] = tagobject['bioGuideId']
-        else:
-            output_dict['bioguideid'] = 'None'
-        for key in ['chamber','congress','party','state','role']:
-            if key in tagobject.attrs:
-                output_dict[key] = tagobject[key]
-            else:
-                output_dict[key] = 'None'
-        try:
-            output_dict['name_full'] = tagobject.find('name',{'type':'authority-fnf'}).string
-        except:
-            output_dict['name_full'] = 'None'
-        return output_dict
-        
     def find_people(self):
-        mbrs = self.doc_ref.find_all('congmember')
-        if mbrs:
-            for mbr in mbrs:
-                self.speakers[mbr.find('name',
-                                       {'type':'parsed'}).string] = \
-                                       self.people_helper(mbr)
+        self.speakers.update(self.doc_ref['speakers'])
     
     def find_related_bills(self):
-        related_bills = self.doc_ref.find_all('bill')
-        if len(related_bills) > 0:
-            self.crdoc['related_bills'] = \
-              [bill.attrs for bill in related_bills]
+        if len(self.doc_ref['related_bills']) > 0:
+            self.crdoc['related_bills'] = self.doc_ref['related_bills']
 
     def find_related_laws(self):
-        related_laws = self.doc_ref.find_all('law')
-        if len(related_laws) > 0:
-            self.crdoc['related_laws'] = \
-              [law.attrs for law in related_laws]
+        if len(self.doc_ref['related_laws']) > 0:
+            self.crdoc['related_laws'] = self.doc_ref['related_laws']
 
     def find_related_usc(self):
-        related_usc = self.doc_ref.find_all('uscode')
-        if len(related_usc) > 0:
-            self.crdoc['related_usc'] = list(
-                itertools.chain.from_iterable(
-                    [[dict([('title',usc['title'])] +
-                        list(sec.attrs.items())) for sec
-                        in usc.find_all('section')]
-                        for usc in related_usc]
-                    )
-                )
+        if len(self.doc_ref['related_usc']) > 0:
+            self.crdoc['related_usc'] = self.doc_ref['related_usc']
 
     def find_related_statute(self):
-        related_statute = self.doc_ref.find_all('statuteatlarge')
-        if len(related_statute) > 0:
-            self.crdoc['related_statute'] = list(
-                itertools.chain.from_iterable(
-                    [[dict([('volume',st['volume'])] +
-                        list(pg.attrs.items())) for pg
-                        in st.find_all('pages')]
-                        for st in related_statute]
-                    )
-                )
+        if len(self.doc_ref['related_statute']) > 0:
+            self.crdoc['related_statute'] = self.doc_ref['related_statute']
         
     def date_from_entry(self):
         year, month, day = re.match(self.re_time,self.access_path).group('year','month','day')
-        if self.doc_ref.time:
-            from_hr,from_min,from_sec = self.doc_ref.time['from'].split(':')
-            to_hr,to_min,to_sec = self.doc_ref.time['to'].split(':')
+        if self.doc_ref.get('time') is not None:
+            from_hr,from_min,from_sec = self.doc_ref['time']['from'].split(':')
+            to_hr,to_min,to_sec = self.doc_ref['time']['to'].split(':')
             try:
                 self.doc_date = datetime(int(year),int(month),int(day))
                 self.doc_start_time = datetime(int(year),int(month),int(day),\
@@ -339,11 +537,10 @@ class ParseCRFile(object):
     # Flow control for metadata generation
     def gen_file_metadata(self):
         # Sometimes the searchtitle has semicolons in it so .split(';') is a nogo
-        temp_ref = self.cr_dir.mods.find('accessid', text=self.access_path)
-        if temp_ref is None:
+        self.doc_ref = self.cr_dir.mods_index.get(self.access_path)
+        if self.doc_ref is None:
             raise RuntimeError("{} doesn't have accessid tag".format(self.access_path))
-        self.doc_ref = temp_ref.parent
-        matchobj = re.match(self.re_vol, self.doc_ref.searchtitle.string)
+        matchobj = re.match(self.re_vol, self.doc_ref['searchtitle'])
         if matchobj:
             self.doc_title, self.cr_vol, self.cr_num = matchobj.group('title','vol','num')
         else:
@@ -357,9 +554,8 @@ class ParseCRFile(object):
         self.find_related_usc()
         self.find_related_statute()
         self.date_from_entry()
-        self.chamber = self.doc_ref.granuleclass.string
-        self.re_newspeaker = self.make_re_newspeaker()
-        self.item_types['speech']['patterns'] = [self.re_newspeaker]
+        self.chamber = self.doc_ref['granuleclass']
+        self.resolver = SpeakerResolver(self.speakers)
 
     # That's it for metadata. Below deals with content.
 
@@ -377,11 +573,12 @@ class ParseCRFile(object):
         and the same way by all object methods.
         """
         self.lines_remaining = True
-        with open(self.filepath, 'r') as htm_file:
+        with TextIOWrapper(self.cr_dir.open(self.filepath), encoding='utf-8') as htm_file:
             htm_lines = htm_file.read()
-            htm_text = BeautifulSoup(htm_lines,"lxml")
-        text = htm_text.pre.text.split('\n')
-        for line in text:
+        text = pre_text(htm_lines)
+        if text is None:
+            raise RuntimeError("{} doesn't have a pre tag".format(self.access_path))
+        for line in iter_lines(text):
             self.cur_line = line
             yield line
         self.lines_remaining = False
@@ -514,7 +711,7 @@ class ParseCRFile(object):
                                      <pattern from patterns>).
                                      .group(<speaker_group>)
     else: speaker = <speaker>
-    (ALSO -- see line 176 for how speech patterns is populated)
+    (ALSO -- see LineClassifier for how speech patterns is populated)
     It has to come after some of the functions because of
     how I want to handle special cases.
     """
@@ -613,29 +810,66 @@ class ParseCRFile(object):
         # Generate all metadata including list of speakers
         self.gen_file_metadata()
         # Must come after speaker list generation
-        self.item_breakers = []
-        self.skip_items = []
-        for x in list(self.item_types.values()):
-            if x['break_flow'] == True:
-                self.item_breakers.extend(x['patterns'])
-            else:
-                self.skip_items.extend(x['patterns'])
+        self.classifier = speaker_classifier(self.speaking_names())
+        self.re_newspeaker = self.classifier.re_newspeaker
 
         # Parse the file
         self.parse()
-
-def parse(cr_dir): # this is taken from the downloader.py file of congressional-record
+        self.unresolved = self.resolver.unresolved
+
+    def __getstate__(self):
+        # Only needed to send parsed files back from parse() workers: the
+        # line generator can't be pickled, the classifier and resolver are
+        # done with, and the directory (whole mods index) gets reattached
+        # by parse()
+        state = self.__dict__.copy()
+        state.pop('the_text', None)
+        state.pop('classifier', None)
+        state.pop('resolver', None)
+        state['cr_dir'] = None
+        return state
+
+_worker_dir = None
+
+def _init_worker(cr_parser):
+    global _worker_dir
+    # With fork, initargs aren't pickled, so a zip the parent already opened
+    # would be shared (file offset and all) by every worker; open our own
+    cr_parser._zip = None
+    _worker_dir = cr_parser
+
+def _parse_worker(parse_path):
+    return ParseCRFile(parse_path, _worker_dir)
+
+def _parse_batch(cr_parser, parse_paths):
+    return [ParseCRFile(parse_path, cr_parser) for parse_path in parse_paths]
+
+def parse(cr_dir, workers = 1, chunksize = 8, executor = None): # this is taken from the downloader.py file of congressional-record
+    '''
+    Yields a parsed ParseCRFile for each granule in `cr_dir`, in filename order
+
+    - cr_dir: an extracted record directory, or the record's zip (path or bytes); zips are read in place without extracting anything
+    - workers: number of processes to parse granules with; 1 parses in this process, None uses every cpu
+    - chunksize: granules handed to a worker at a time (only used when workers != 1)
+    - executor: a ProcessPoolExecutor (of `workers` processes) to parse with, instead of starting one for this record; e.g. one started before any threads, and shared by many records (see ingestor.ingest)
+
+    mods.xml is only indexed once (here); the index is shipped to each worker when the pool starts (or, with a shared `executor`, along with each of a couple of batches of granules per worker)
+    '''
     cr_parser = ParseCRDir(cr_dir)
-    results = []
-    for file in os.listdir(os.path.join(cr_dir, 'html')):
-        parse_path = os.path.join(cr_dir, 'html', file)
-        if any((
-            '-PgD' in parse_path,
-            'FrontMatter' in parse_path,
-            '-Pgnull' in parse_path)):
-            pass
-            # logging.info('Skipping {}'.format(parse_path))
-        else:
+    paths = cr_parser.granule_paths()
+    if executor is not None:
+        size = max(chunksize, -(-len(paths) // (2 * (workers or os.cpu_count() or 1)))) # <-- few batches, since each one carries the whole record
+        batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+        for batch in executor.map(_parse_batch, itertools.repeat(cr_parser), batches):
+            for crfile in batch:
+                crfile.cr_dir = cr_parser
+                yield crfile
+    elif workers == 1:
+        for parse_path in paths:
             crfile = ParseCRFile(parse_path, cr_parser)
             yield crfile
-    # return results
\ No newline at end of file
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers, initializer = _init_worker, initargs = (cr_parser,)) as executor:
+            for crfile in executor.map(_parse_worker, paths, chunksize = chunksize):
+                crfile.cr_dir = cr_parser
+                yield crfile
\ No newline at end of file
@@ -9,12 +9,26 @@ import dataset
 
 # Internal Resources
 import ingestor
+import recordcache
 
 # Setup
 dotenv.load_dotenv('../env')
 dotenv.load_dotenv(os.environ['PATH_TO_SECRETS'])
 api_key = os.environ['CONGRESS_API']
 
+parser = argparse.ArgumentParser(description = 'Harvest floor speeches from the congressional record')
+parser.add_argument('--start-date', type = datetime.date.fromisoformat, default = None, help = 'first date to harvest (YYYY-MM-DD; default: a few days before the last checkpointed record)')
+parser.add_argument('--end-date', type = datetime.date.fromisoformat, default = datetime.datetime.now().date(), help = 'last date to harvest (YYYY-MM-DD; default: today)')
+parser.add_argument('--lookback-days', type = int, default = 7, help = 'how far before the last checkpointed record to start looking (records can be published late); default: 7')
+parser.add_argument('--download-workers', type = int, default = 4, help = 'number of records to download at once; default: 4')
+parser.add_argument('--parse-workers', type = int, default = 1, help = 'number of processes to parse each record with; default: 1')
+parser.add_argument('--chunk-size', type = int, default = 1000, help = 'rows per insert statement; default: 1000')
+parser.add_argument('--reingest', action = 'store_true', help = 'download and write records again even if they are checkpointed (rows already in the table are skipped)')
+parser.add_argument('--update-existing', action = 'store_true', help = 'overwrite rows already in the table (matched on unique_id) instead of skipping them; e.g. after a parser fix')
+parser.add_argument('--cache-dir', default = None, help = 'keep downloaded record zips and their parses here (e.g. .tmp/records) and reuse them on later runs; default: no cache (nothing is written to disk)')
+parser.add_argument('--cache-size-gb', type = float, default = 2, help = 'evict the least recently used records once the cache is bigger than this; default: 2')
+args = parser.parse_args()
+
 ## Connect to DB
 db = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
 logdb = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
@@ -24,31 +38,36 @@ start_date = datetime.date(2024,6,3)
 
 dbx = dataset.connect(db)
 max_date = sql.select(sql.func.max(dbx[ingestor.tablename].table.c.date)).execute().first()[0]
+max_checkpoint_date = None
+if ingestor.checkpoint_tablename in dbx.tables:
+    max_checkpoint_date = sql.select(sql.func.max(dbx[ingestor.checkpoint_tablename].table.c.date)).execute().first()[0]
 init_count = dbx[ingestor.tablename].count()
 dbx.engine.dispose(); dbx.close()
 
-if max_date: start_date = max_date + datetime.timedelta(days=1)
-
-end_date = datetime.datetime.now().date()
+# Records are checkpointed as they're ingested, so we can safely look back over the last few days (already-ingested records are skipped without being downloaded)
+# - before there are any checkpoints, fall back to picking up after the last date in the floor table
+if max_checkpoint_date: start_date = max_checkpoint_date - datetime.timedelta(days = args.lookback_days)
+elif max_date: start_date = max_date + datetime.timedelta(days=1)
 
-# Execute Harvester
-for d, day in enumerate(range((end_date - start_date).days)):
-    date = start_date + datetime.timedelta(days = day)
-    
-    print('collecting for:', date)
-    dbx = dataset.connect(db)
-    existing = dbx[ingestor.tablename].find_one(date = date)
-    dbx.engine.dispose(); dbx.close()
+if args.start_date: start_date = args.start_date
 
-    if existing:
-        print(f'Skipping {date} since there are already existing entries for that date')
+end_date = args.end_date
 
-    else:
-        ingestor.ingest(date, date, db, logdb, api_key)
+# Execute Harvester
+cache = recordcache.RecordCache(args.cache_dir, max_bytes = int(args.cache_size_gb * 1024**3)) if args.cache_dir else None
+print(f'collecting for: {start_date} -to- {end_date}')
+ingestor.ingest(
+    start_date, end_date, db, logdb, api_key,
+    workers = args.parse_workers,
+    download_workers = args.download_workers,
+    chunk_size = args.chunk_size,
+    reingest = args.reingest,
+    update = args.update_existing,
+    cache = cache,
+)
 
 dbx = dataset.connect(db)
 end_count = dbx[ingestor.tablename].count()
 dbx.engine.dispose(); dbx.close()
 
 print(f'\titems processed: {end_count - init_count}')
-
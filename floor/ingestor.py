@@ -4,15 +4,20 @@ title: House and Senate Floor Speech Ingester
 ---
 '''
 # Python Standard Library
-import os, json, datetime, tempfile, time, requests, zipfile, io
+import os, json, datetime, tempfile, time, requests, zipfile, io, threading, collections, contextlib
+import concurrent.futures
 
 # External Resources
 import dataset
+import sqlalchemy as sql
+from sqlalchemy.dialects import mysql
 
 # Internal Resources
 import congressionalrecordparser
+import recordcache
 
 tablename = 'floor'
+checkpoint_tablename = 'floor_checkpoints' # <-- one row per govinfo record zip that's been fully ingested
 
 def init(db):
     with dataset.connect(db) as dbx:
@@ -28,71 +33,238 @@ def init(db):
         table.create_column('cr_num', dbx.types.integer)
         table.create_column('unique_id', dbx.types.string(150), unique = True, nullable = True)
 
-def ingest(start_date, end_date, db, logdb, api_key):
+        checkpoints = dbx.create_table(checkpoint_tablename, primary_id = 'id', primary_type = dbx.types.integer, primary_increment = True)
+        checkpoints.create_column('record_name', dbx.types.string(100), unique = True)
+        checkpoints.create_column('date', dbx.types.date)
+        checkpoints.create_column('entries', dbx.types.integer)
+        checkpoints.create_column('ingested_at', dbx.types.datetime)
+
+
+class RateLimiter:
+    '''
+    Spaces out calls (across threads) so we stay under `calls` per `period` seconds
+    - congress.gov allows 5,000 requests an hour per api key
+    '''
+    def __init__(self, calls = 5000, period = 3600):
+        self.interval = period / calls
+        self.next_call = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def list_records(date, api_key, limiter):
+    '''
+    Use the Congress.gov API to get the names of all congressional records (e.g. CREC-2024-06-04) for a date
+    '''
+    limiter.wait()
+    response = requests.get(
+        "https://api.congress.gov/v3/congressional-record",
+        params = {'format': 'json',  'y': date.year, 'm': date.month, 'd': date.day, 'offset': 0, 'limit': 100,},
+        headers = {'x-api-key': api_key}
+    )
+
+    response.raise_for_status()
+    issues = response.json().get('Results', {}).get('Issues', None)
+
+    record_names = []
+    for issue in issues or []:
+        full_record = issue.get("Links", {}).get("FullRecord", {}).get("PDF", [])[0]
+        record_names.append(full_record.get("Url", "").split('/')[-1].split('.')[0])
+    return record_names
+
+
+def download_record(record_name, chunk_size = 1024 * 1024):
+    '''
+    Download a record's zip file from govinfo into memory; congressionalrecordparser reads it in place, so nothing gets written to (or extracted onto) disk
+    '''
+    download_url = f"https://www.govinfo.gov/content/pkg/{record_name}.zip"
+
+    with requests.get(download_url, stream=True) as zip_response:
+        zip_response.raise_for_status()
+
+        zip_buffer = io.BytesIO()
+        for chunk in zip_response.iter_content(chunk_size=chunk_size):
+            zip_buffer.write(chunk)
+
+    return zip_buffer.getvalue()
+
+
+def record_entries(record, record_name, workers = 1, cache = None, executor = None):
+    '''
+    Parse a record (its zip, or an extracted directory) with congressionrecordparser and turn every speech by a known speaker into a `floor` row
+    - cache: a recordcache.RecordCache; reuses (or saves) the parsed record so it's only parsed once per parser version
+    - executor: a process pool (of `workers` processes) shared across records; see congressionalrecordparser.parse
+    '''
+    entries, unresolved = [], collections.Counter()
+    if cache:
+        crfiles = cache.parse(record_name, record, workers = workers, executor = executor)
+    else:
+        crfiles = congressionalrecordparser.parse(record, workers = workers, executor = executor)
+    for crfile in crfiles:
+        for i, speech in enumerate(crfile.crdoc['content']):
+            if speech.get('speaker_bioguide'):
+                entry_date = datetime.datetime.strptime(
+                    crfile.crdoc['header']['year'] + '-' + str(datetime.datetime.strptime(crfile.crdoc['header']["month"],'%B').month) + '-' + crfile.crdoc['header']['day'],
+                    '%Y-%m-%d'
+                ).date()
+                entries.append({
+                    # id (auto increment)
+                    'date': entry_date,
+                    'bioguide_id': speech['speaker_bioguide'],
+                    'text': speech['text'],
+                    'chamber': crfile.chamber,
+                    'record_id': record_name,
+                    'file_id': crfile.access_path,
+                    'item_id': f'{i}',
+                    'cr_vol': crfile.cr_vol,
+                    'cr_num': crfile.cr_num,
+                    'unique_id': f"{entry_date}-{record_name}-{crfile.access_path}-{i}-{speech['speaker_bioguide']}",
+                })
+        unresolved.update(crfile.unresolved)
+
+    # Speeches we couldn't tie to a member (mostly presiding officers) don't make it into `floor`
+    if unresolved:
+        print(f'\t{record_name}: {sum(unresolved.values())} speeches without a bioguide id (most common: ' + ', '.join(f'{name} x{count}' for name, count in unresolved.most_common(3)) + ')')
+    return entries
+
+
+def completed_records(dbx):
+    '''
+    Names of the records that have already been fully ingested
+    '''
+    if checkpoint_tablename not in dbx.tables:
+        return set()
+    return set(row['record_name'] for row in dbx[checkpoint_tablename].distinct('record_name'))
+
+
+def write_entries(conn, table, entries, chunk_size = 1000, update = False):
+    '''
+    Bulk write `floor` rows as multi-row inserts of `chunk_size` rows, relying on the unique_id key to make re-runs safe
+    - by default rows whose unique_id is already in the table are skipped (INSERT IGNORE), so existing ids never change
+    - update: overwrite the existing rows' fields instead (INSERT ... ON DUPLICATE KEY UPDATE); e.g. to push parser fixes
+
+    Returns counts: {'inserted': ..., 'skipped': ...} (or 'updated' instead of 'skipped' when update = True)
+    '''
+    counts = {'inserted': 0, 'updated' if update else 'skipped': 0}
+    for i in range(0, len(entries), chunk_size):
+        chunk = entries[i:i + chunk_size]
+        stmt = mysql.insert(table).values(chunk)
+
+        if update:
+            # mysql's affected-row counts can't tell updated rows apart from inserted ones, so look them up first
+            existing = conn.execute(
+                sql.select(table.c.unique_id).where(table.c.unique_id.in_([entry['unique_id'] for entry in chunk]))
+            ).fetchall()
+            conn.execute(stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in chunk[0] if column != 'unique_id'}))
+            counts['inserted'] += len(chunk) - len(existing)
+            counts['updated'] += len(existing)
+        else:
+            inserted = conn.execute(stmt.prefix_with('IGNORE')).rowcount
+            counts['inserted'] += inserted
+            counts['skipped'] += len(chunk) - inserted
+    return counts
+
+
+def write_record(dbx, record_name, date, entries, chunk_size = 1000, update = False):
+    '''
+    Write a record's entries and checkpoint it in one transaction (so a record is either fully ingested or not at all)
+    - rows that are already there (e.g. from a partial run before checkpoints existed, or a re-run) are skipped or updated; see write_entries
+    '''
+    checkpoints = dbx[checkpoint_tablename].table
+    checkpoint = mysql.insert(checkpoints).values(
+        record_name = record_name,
+        date = date,
+        entries = len(entries),
+        ingested_at = datetime.datetime.now(),
+    )
+
+    with dbx.engine.begin() as conn: # <-- pooled connection
+        counts = write_entries(conn, dbx[tablename].table, entries, chunk_size = chunk_size, update = update)
+        conn.execute(checkpoint.on_duplicate_key_update(
+            date = checkpoint.inserted.date,
+            entries = checkpoint.inserted.entries,
+            ingested_at = checkpoint.inserted.ingested_at,
+        ))
+
+    return counts
+
+
+def ingest(start_date, end_date, db, logdb, api_key, workers = 1, download_workers = 4, limiter = None, chunk_size = 1000, reingest = False, update = False, cache = None):
     '''
     Ingest the Data
+
+    - i/o: lists each date's records via the congress.gov api (rate limited), and downloads each record that isn't checkpointed yet (into memory) as soon as its listing comes back; all of it through `download_workers` threads, with at most 2 * `download_workers` listings/downloads submitted at once (downloads first), so a long range never has more than that many records sitting in memory
+    - cpu: each downloaded record is parsed as it arrives (with `workers` processes, from one pool started before the download threads; see congressionalrecordparser.parse), written, and checkpointed
+    - a listing, download, or parse that fails is logged and skipped; nothing's checkpointed for it, so the next run over its date tries it again
+
+    Records are checkpointed once written, so re-running a range after a crash only downloads what's missing.
+    - reingest: download and write checkpointed records again anyway
+    - update: overwrite rows that are already in the table rather than skipping them (see write_entries)
+    - chunk_size: rows per insert statement
+    - cache: a recordcache.RecordCache; records (and their parses) in it aren't downloaded (or parsed) again, e.g. when re-deriving rows with --reingest
+
+    Returns the (date, record name or None) of everything that failed
     '''
-    # for i in range(start_date, end_date, datetime.timedelta(days = 1)):
-    for i in range((end_date - start_date).days + 1):
-        entries = []
-        date = start_date + datetime.timedelta(days = i)
-
-        # # use Congress.gov API to get all congressional records for that date
-        response = requests.get(
-            "https://api.congress.gov/v3/congressional-record",
-            params = {'format': 'json',  'y': date.year, 'm': date.month, 'd': date.day, 'offset': 0, 'limit': 100,},
-            headers = {'x-api-key': api_key}
-        )
-
-        response.raise_for_status()
-        issues = response.json().get('Results', {}).get('Issues', None)
-        if issues:
-            for issue in issues:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # temp_dir = '.tmp/'
-
-                    # Find out the record that we're downloading
-                    full_record = issue.get("Links", {}).get("FullRecord", {}).get("PDF", [])[0]
-                    record_name = full_record.get("Url", "").split('/')[-1].split('.')[0]
-                    download_url = f"https://www.govinfo.gov/content/pkg/{record_name}.zip"
-
-                    # Download and process record zip file
-                    with requests.get(download_url, stream=True) as zip_response:
-                        zip_response.raise_for_status()
-
-                        zip_file_path = os.path.join(temp_dir, f"{date.year}-{date.month}-{date.day}.zip")
-                        with open(zip_file_path, 'wb') as zip_file:
-                            for chunk in zip_response.iter_content(chunk_size=8192):
-                                zip_file.write(chunk)
-
-                    # Extract zip file
-                    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                        zip_ref.extractall(temp_dir)
-
-                    # Parse with congressionrecordparser and loop through all speeches
-                    crfiles = congressionalrecordparser.parse(os.path.join(temp_dir, record_name))
-                    for crfile in crfiles:
-                        for i, speech in enumerate(crfile.crdoc['content']):
-                            if speech.get('speaker_bioguide'):
-                                entry_date = datetime.datetime.strptime(
-                                    crfile.crdoc['header']['year'] + '-' + str(datetime.datetime.strptime(crfile.crdoc['header']["month"],'%B').month) + '-' + crfile.crdoc['header']['day'],
-                                    '%Y-%m-%d'
-                                ).date()
-                                entries.append({
-                                    # id (auto increment)
-                                    'date': entry_date,
-                                    'bioguide_id': speech['speaker_bioguide'],
-                                    'text': speech['text'],
-                                    'chamber': crfile.chamber,
-                                    'record_id': record_name,
-                                    'file_id': crfile.access_path,
-                                    'item_id': f'{i}',
-                                    'cr_vol': crfile.cr_vol,
-                                    'cr_num': crfile.cr_num,
-                                    'unique_id': f"{entry_date}-{record_name}-{crfile.access_path}-{i}-{speech['speaker_bioguide']}",
-                                })
-
-        dbx = dataset.connect(db)
-        dbx[tablename].insert_many(entries)
-        dbx.engine.dispose(); dbx.close()
+    limiter = limiter or RateLimiter()
+    dates = [start_date + datetime.timedelta(days = i) for i in range((end_date - start_date).days + 1)]
+
+    init(db) # <-- make sure both tables (and all their columns) exist, since we write to them directly
+    dbx = dataset.connect(db)
+    done = set() if reingest else completed_records(dbx)
+
+    def parse_and_write(date, record_name, record):
+        entries = record_entries(record, record_name, workers = workers, cache = cache, executor = parse_pool)
+        counts = write_record(dbx, record_name, date, entries, chunk_size = chunk_size, update = update)
+        print(f'\t{record_name}: ' + ', '.join(f'{n} {count}' for count, n in counts.items()) + f' ({len(entries)} total)')
+        done.add(record_name)
+
+    fetch = (lambda record_name: cache.fetch(record_name, download_record)) if cache else download_record # <-- cached zips skip the network
+    listings = collections.deque(dates)
+    downloads = collections.deque() # <-- (date, record_name) of records listed but not yet downloading
+    running = {} # <-- future: (kind, date, record_name)
+    max_running = 2 * download_workers
+    queued, failed = set(), []
+
+    with contextlib.ExitStack() as stack:
+        parse_pool = None
+        if workers != 1:
+            parse_pool = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers = workers))
+            parse_pool.submit(int).result() # <-- pool first: start (fork) the parse workers now, before any download threads exist
+        executor = stack.enter_context(concurrent.futures.ThreadPoolExecutor(max_workers = download_workers))
+
+        while listings or downloads or running:
+            while downloads and len(running) < max_running:
+                date, record_name = downloads.popleft()
+                running[executor.submit(fetch, record_name)] = ('download', date, record_name)
+            while listings and len(running) < max_running and len(downloads) < max_running:
+                date = listings.popleft()
+                running[executor.submit(list_records, date, api_key, limiter)] = ('list', date, None)
+
+            finished, _ = concurrent.futures.wait(running, return_when = concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                kind, date, record_name = running.pop(future)
+                try:
+                    if kind == 'list':
+                        for name in future.result():
+                            if name in done:
+                                print(f'\tSkipping {name}; already ingested')
+                            elif name not in queued:
+                                downloads.append((date, name))
+                                queued.add(name)
+                    else:
+                        parse_and_write(date, record_name, future.result()) # <-- the other downloads carry on meanwhile
+                except Exception as e: # <-- one date or record failing shouldn't stop the rest; it isn't checkpointed, so the next run tries it again
+                    print(f"FAILED TO {'LIST' if kind == 'list' else 'INGEST'}: {record_name or date} ::>> {e}")
+                    failed.append((date, record_name))
 
+    dbx.engine.dispose(); dbx.close()
+    if failed:
+        print(f'{len(failed)} dates/records failed; re-run with --start-date {min(date for date, _ in failed)} to retry them')
+    return failed
@@ -0,0 +1,157 @@
+'''
+---
+title: Floor Record Cache
+---
+
+Local, size-capped cache of govinfo record zips and their parsed output, keyed by record name (e.g. CREC-2024-06-04)
+
+- `zips/<record_name>.zip`: the raw package, exactly as downloaded
+- `parsed/<record_name>/<zip sha256>-<parser version>.json.gz`: what `congressionalrecordparser.parse` made of that zip (one json line per granule)
+
+Parsed output is addressed by the zip's content and the parser's source, so a parser fix (or a re-published record) just misses the cache and re-parses from the cached zip; a downstream change (e.g. to the `floor` schema) hits it and skips both the download and the html parsing.
+
+Files are evicted least recently used first (by mtime, which is bumped on every hit) once the cache grows past `max_bytes` (2 GB by default).
+
+The cache is opt-in (`ingest.py --cache-dir`): by default the harvester keeps records in memory and writes nothing to disk.
+'''
+# Python Standard Library
+import os, json, gzip, hashlib, threading
+
+# Internal Resources
+import congressionalrecordparser
+
+with open(congressionalrecordparser.__file__, 'rb') as f:
+    parser_version = hashlib.sha256(f.read()).hexdigest()[:16] # <-- any change to the parser invalidates parsed output
+
+
+class CachedCRFile(object):
+    '''
+    Stand-in for a parsed `ParseCRFile`, holding just the parts ingestor.py uses
+    '''
+    fields = ('access_path', 'chamber', 'cr_vol', 'cr_num', 'crdoc', 'unresolved')
+
+    def __init__(self, **kwargs):
+        for field in self.fields:
+            setattr(self, field, kwargs[field])
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.fields}
+
+
+class RecordCache(object):
+
+    def __init__(self, path, max_bytes = 2 * 1024**3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock() # <-- zips are stored from the download threads
+        os.makedirs(os.path.join(path, 'zips'), exist_ok = True)
+        os.makedirs(os.path.join(path, 'parsed'), exist_ok = True)
+
+    def zip_path(self, record_name):
+        return os.path.join(self.path, 'zips', f'{record_name}.zip')
+
+    def parsed_path(self, record_name, digest):
+        return os.path.join(self.path, 'parsed', record_name, f'{digest}-{parser_version}.json.gz')
+
+    def touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError: # <-- evicted by another thread (or process) in the meantime
+            return False
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path) # <-- readers never see a partial file
+        self.evict(keep = path)
+
+    def get_zip(self, record_name):
+        '''
+        The record's zip (bytes), or None if it isn't cached
+        '''
+        path = self.zip_path(record_name)
+        if not self.touch(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def put_zip(self, record_name, data):
+        self.write(self.zip_path(record_name), data)
+
+    def fetch(self, record_name, download):
+        '''
+        The record's zip from the cache, or from `download(record_name)` (and then cached)
+        '''
+        data = self.get_zip(record_name)
+        if data is None:
+            data = download(record_name)
+            self.put_zip(record_name, data)
+        return data
+
+    def get_parsed(self, record_name, digest):
+        '''
+        The parsed granules (CachedCRFiles) for this version of the record, or None if it hasn't been parsed by the current parser
+        '''
+        path = self.parsed_path(record_name, digest)
+        if not self.touch(path):
+            return None
+        with gzip.open(path, 'rt', encoding = 'utf-8') as f:
+            return [CachedCRFile(**json.loads(line)) for line in f]
+
+    def put_parsed(self, record_name, digest, crfiles):
+        path = self.parsed_path(record_name, digest)
+        lines = ''.join(json.dumps(crfile.to_dict(), separators = (',', ':')) + '\n' for crfile in crfiles)
+        self.write(path, gzip.compress(lines.encode('utf-8')))
+
+        # Older parses of this record can't be hit again
+        for filename in os.listdir(os.path.dirname(path)):
+            if filename != os.path.basename(path) and filename.endswith('.json.gz'):
+                try:
+                    os.remove(os.path.join(os.path.dirname(path), filename))
+                except FileNotFoundError:
+                    pass
+
+    def parse(self, record_name, record, workers = 1, executor = None):
+        '''
+        Parse a record's zip (bytes) with congressionalrecordparser.parse (with `workers` processes, or a shared `executor`), or load the result of having done so before
+
+        Returns a list of granules with `access_path`, `chamber`, `cr_vol`, `cr_num`, `crdoc`, and `unresolved` (ParseCRFiles on a miss, CachedCRFiles on a hit)
+        '''
+        digest = hashlib.sha256(record).hexdigest()[:16]
+        crfiles = self.get_parsed(record_name, digest)
+        if crfiles is None:
+            crfiles = list(congressionalrecordparser.parse(record, workers = workers, executor = executor))
+            self.put_parsed(record_name, digest, [CachedCRFile(**{field: getattr(crfile, field) for field in CachedCRFile.fields}) for crfile in crfiles])
+        return crfiles
+
+    def evict(self, keep = None):
+        '''
+        Delete least recently used files until the cache fits in max_bytes (never deleting `keep`, the file just written, or anyone's half-written `*.tmp` files)
+        '''
+        with self.lock:
+            files = []
+            for root, dirs, filenames in os.walk(self.path):
+                for filename in filenames:
+                    if filename.endswith('.tmp'): # <-- still being written (maybe by another process); it's os.replace'd into place when done
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
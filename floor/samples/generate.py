@@ -0,0 +1,197 @@
+'''
+---
+title: Sample Congressional Record Packages
+---
+
+Writes small, synthetic govinfo record zips (`CREC-YYYY-MM-DD.zip` holding `CREC-YYYY-MM-DD/mods.xml` and `CREC-YYYY-MM-DD/html/*.htm`) for benchmark.py to parse offline
+
+The granules are made up, but follow the layout (and quirks) of the real thing: senate/house/extensions granules, members that are and aren't SPEAKING, speakers missing from mods.xml, recorder/clerk/rollcall/title/page-break lines, granules without a vol/num or a time, and the digest/front matter files the parser skips.
+
+`CREC-2024-06-07` also has the markup real packages have that the others don't: a package-level `<extension>` listing every member (including one no granule lists), nested `<relatedItem type="otherFormat">` links inside each granule's `<relatedItem>` (before and after its `<extension>`), and `<pre>` text full of entities (`&lt;bullet&gt;`, `&#x27;`, `&nbsp;`, `&sect;`), links, tabs, trailing whitespace and CRLF line endings.
+
+Output is deterministic (seeded), so the zips only change if this script does. Their golden fixtures are written by the baseline parser (the one in the repo's first commit), not the current one:
+
+    cd .. && python benchmark.py --update-golden --golden-ref $(git rev-list --max-parents=0 HEAD)
+
+usage: python generate.py [--out-dir .] [--granules 60]
+'''
+# Python Standard Library
+import os, random, zipfile, argparse
+
+records = [('CREC-2024-06-04', 0, False), ('CREC-2024-06-05', 1, False), ('CREC-2024-06-06', 2, False), ('CREC-2024-06-07', 3, True)] # <-- (record name, seed, real-world quirks)
+
+people = [
+    # (name in the text, full name, bioguide id, chamber, state, party)
+    ('DURBIN', 'Richard J. Durbin', 'D000563', 'S', 'IL', 'D'),
+    ('THUNE', 'John Thune', 'T000250', 'S', 'SD', 'R'),
+    ('SCHUMER', 'Charles E. Schumer', 'S000148', 'S', 'NY', 'D'),
+    ('McCONNELL', 'Mitch McConnell', 'M000355', 'S', 'KY', 'R'),
+    ('JOHNSON of Louisiana', 'Mike Johnson', 'J000299', 'H', 'LA', 'R'),
+    ('JEFFRIES', 'Hakeem S. Jeffries', 'J000294', 'H', 'NY', 'D'),
+    ('GARCÍA', 'Jesus G. Garcia', 'G000586', 'H', 'IL', 'D'),
+    ("O'DONNELL", "Patrick O'Donnell", 'O000001', 'H', 'TX', 'R'),
+]
+package_only = ('CORNYN', 'John Cornyn', 'C001056', 'S', 'TX', 'R') # <-- listed at the package level only (quirks records), so never resolved in a granule
+quirky_lines = [
+    '  &lt;bullet&gt; Sec. 2. &sect; 101(a) of title 10 is amended by striking &#x27;&#x27;2024&#x27;&#x27; and inserting ``2025&#x27;&#x27;.',
+    '  &lt;all&gt;',
+    '\tTABLE 1.--FUNDING BY ACCOUNT&nbsp;[In thousands of dollars]',
+    '  See <a href="https://www.congress.gov/bill/118th-congress/house-bill/8070">H.R. 8070</a> &amp; S. 4638 for details.   ',
+    '                    \u2014\u2014\u2014 \u201cquoted\u201d text \u2014\u2014\u2014',
+    '  Mr. CORNYN. Mr. President, I ask unanimous consent that the order be rescinded.',
+]
+words = 'the bill would provide funding for our veterans and families across the country while we debate amendments to the appropriations process and the budget'.split()
+titles = ['NOMINATION OF JOHN DOE', 'MORNING BUSINESS', 'RECOGNIZING THE 100TH ANNIVERSARY OF THE TOWN', 'LEGISLATIVE SESSION', 'NATIONAL DEFENSE AUTHORIZATION ACT FOR FISCAL YEAR 2025']
+recorder = [
+    '  The legislative clerk read as follows:',
+    '  There being no objection, the material was ordered to be printed in the Record, as follows:',
+    '  The motion was agreed to.',
+    '  The yeas and nays were ordered.',
+    '  The question was taken; and the Speaker pro tempore announced that the ayes appeared to have it.',
+    '  The bill clerk proceeded to call the roll.',
+    '  Amendment No. 2024 is as follows:',
+    '  Pending:',
+    '  By Mr. DURBIN (for himself and Mr. THUNE):',
+]
+chambers = [('Senate', 'SENATE', 'S'), ('House of Representatives', 'HOUSE', 'H'), ('Extensions of Remarks', 'EXTENSIONS', 'E')]
+
+
+def paragraph(rng):
+    return [' '.join(rng.choice(words) for _ in range(11)) for _ in range(rng.randint(1, 6))]
+
+
+def honorific(name):
+    return 'Ms' if name == 'GARCÍA' else 'Mr'
+
+
+def granule_body(rng, record_name, cname, letter, page, title, speakers, quirks = False):
+    year, month, day = record_name.split('-')[1:4]
+    body = [
+        f'[Congressional Record Volume 170, Number 95 (Tuesday, June {int(day)}, {year})]',
+        f'[{cname}]',
+        f'[Page {letter}{page}]',
+        'From the Congressional Record Online through the Government Publishing Office [<a href="https://www.gpo.gov">www.gpo.gov</a>]',
+        '', '', '', '',
+        ' ' * 20 + title,
+        '',
+    ]
+    for _ in range(rng.randint(5, 40)):
+        r = rng.random()
+        if r < .5:
+            who = rng.choice(speakers + [None])
+            name = 'The PRESIDING OFFICER' if who is None else f'{honorific(who[0])}. {who[0]}'
+            if rng.random() < .1:
+                name = 'Mr. SMITH of Texas' # <-- not in mods.xml, so never resolved
+            lines = paragraph(rng)
+            body.append(f'  {name}. ' + lines[0])
+            body.extend(lines[1:])
+        elif r < .6:
+            body.append(rng.choice(recorder))
+            body.extend(paragraph(rng))
+        elif r < .65: body.extend(['', f'                                  [[Page {letter}{page + 1}]]', ''])
+        elif r < .7: body.extend(['', '                              {time}  1430', ''])
+        elif r < .75: body.extend(['', '                          ____________________', ''])
+        elif r < .8: body.extend(['', '                      AMENDMENTS SUBMITTED &amp; PROPOSED', ''])
+        elif r < .85: body.extend(['  The Clerk read the title of the bill.'])
+        elif r < .9: body.extend(['  [Rollcall Vote No. 187 Leg.]', '   '])
+        else: body.extend(['  <bullet> ' + ' '.join(paragraph(rng)), '   '])
+        if quirks and rng.random() < .3:
+            body.append(rng.choice(quirky_lines))
+    body.append('')
+    html = (
+        f'<html>\n<head>\n<title>Congressional Record, Volume 170 Issue 95 (Tuesday, June {int(day)}, {year})</title>\n</head>\n<body><pre>\n'
+        + '\n'.join(body)
+        + '\n</pre></body>\n</html>\n'
+    )
+    if quirks and (page % 4 == 1):
+        html = html.replace('<body><pre>', '<body>\n<p>Congressional Record</p><pre class="crec" >').replace('\n', '\r\n') # <-- attributes on <pre>, markup before it, and windows line endings
+    return html
+
+
+def congmember(person, role):
+    name, full_name, bioguide_id, chamber, state, party = person
+    return (
+        f'<congMember authorityId="x" bioGuideId="{bioguide_id}" chamber="{chamber}" congress="118" party="{party}" role="{role}" state="{state}">'
+        f'<name type="parsed">{honorific(name)}. {name}</name><name type="authority-fnf">{full_name}</name><name type="authority-lnf">{full_name}</name></congMember>'
+    )
+
+
+def other_formats(record_name, access_id):
+    return (
+        f'<relatedItem type="otherFormat" xlink:href="https://www.govinfo.gov/content/pkg/{record_name}/html/{access_id}.htm"><identifier type="uri">https://www.govinfo.gov/content/pkg/{record_name}/html/{access_id}.htm</identifier></relatedItem>'
+        f'<relatedItem type="otherFormat" xlink:href="https://www.govinfo.gov/content/pkg/{record_name}/pdf/{access_id}.pdf"><identifier type="uri">https://www.govinfo.gov/content/pkg/{record_name}/pdf/{access_id}.pdf</identifier></relatedItem>'
+    )
+
+
+def package(record_name, seed, n_granules, quirks = False):
+    '''
+    Returns {path in the zip: contents} for one record (with the markup quirks of real records if `quirks`)
+    '''
+    rng = random.Random(seed)
+    year, month, day = record_name.split('-')[1:4]
+    files = {}
+    mods = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<mods xmlns="http://www.loc.gov/mods/v3" xmlns:xlink="http://www.w3.org/1999/xlink" version="3.3">',
+    ]
+    if quirks:
+        mods.append(
+            f'<extension><accessId>{record_name}</accessId><searchTitle>Congressional Record Volume 170, Issue 95</searchTitle>'
+            + ''.join(congmember(person, 'SPEAKING') for person in people + [package_only])
+            + '</extension>'
+        )
+    else:
+        mods.append(f'<extension><accessId>{record_name}</accessId><searchTitle>Congressional Record Volume 170, Issue 95</searchTitle></extension>')
+    for g in range(n_granules):
+        cname, gclass, letter = chambers[g % 3]
+        page = 3500 + g
+        access_id = f'{record_name}-pt1-Pg{letter}{page}' + (f'-{g}' if g % 7 == 3 else '')
+        title = rng.choice(titles)
+        speakers = rng.sample(people, 3)
+
+        mods.append(f'<relatedItem type="constituent" ID="id-{access_id}" xlink:href="https://www.govinfo.gov/app/details/{record_name}/{access_id}">')
+        mods.append(f'<titleInfo><title>{title}</title></titleInfo><identifier type="uri">https://www.govinfo.gov/app/details/{record_name}/{access_id}</identifier>')
+        if quirks and g % 2 == 0:
+            mods.append(other_formats(record_name, access_id))
+        mods.append(f'<extension><granuleClass>{gclass}</granuleClass><accessId>{access_id}</accessId>')
+        if g % 5 != 1:
+            mods.append(f'<searchTitle>{title}; Congressional Record Vol. 170, No. 95</searchTitle>')
+        else:
+            mods.append(f'<searchTitle>{title}</searchTitle>') # <-- no vol/num
+        if g % 4 != 2:
+            mods.append(f'<time from="1{g % 10}:0{g % 6}:00" to="1{g % 10}:1{g % 6}:00"/>')
+        for person in speakers:
+            mods.append(congmember(person, 'SPEAKING' if rng.random() < .8 else 'SPONSOR'))
+        if g % 3 == 0: mods.append(f'<bill congress="118" context="MENTIONED" number="{g}" type="s"/><bill congress="118" number="{g + 1}" type="hr"/>')
+        if g % 4 == 0: mods.append(f'<law number="{g}" type="public"/>')
+        if g % 6 == 0: mods.append(f'<uscode title="42"><section number="1983"/><section number="{g}"/></uscode>')
+        if g % 8 == 0: mods.append(f'<statuteAtLarge volume="136"><pages pages="{g}"/></statuteAtLarge>')
+        mods.append('</extension>' + (other_formats(record_name, access_id) if quirks and g % 2 == 1 else '') + '</relatedItem>')
+
+        files[f'{record_name}/html/{access_id}.htm'] = granule_body(rng, record_name, cname, letter, page, title, speakers, quirks)
+
+    for skipped in [f'{record_name}-FrontMatter', f'{record_name}-pt1-PgD500', f'{record_name}-pt1-Pgnull']:
+        files[f'{record_name}/html/{skipped}.htm'] = '<html><body><pre>\nnothing\n</pre></body></html>'
+    mods.append('</mods>')
+    files[f'{record_name}/mods.xml'] = '\n'.join(mods)
+    return files
+
+
+def write_zip(path, files):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name in sorted(files):
+            info = zipfile.ZipInfo(name, date_time = (2024, 6, 1, 0, 0, 0)) # <-- fixed timestamps keep the zips byte-for-byte reproducible
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, files[name].encode('utf-8'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Write the synthetic sample records benchmark.py parses')
+    parser.add_argument('--out-dir', default = os.path.dirname(os.path.abspath(__file__)), help = 'where to write the zips; default: next to this script')
+    parser.add_argument('--granules', type = int, default = 60, help = 'granules per record; default: 60')
+    args = parser.parse_args()
+
+    for record_name, seed, quirks in records:
+        path = os.path.join(args.out_dir, f'{record_name}.zip')
+        write_zip(path, package(record_name, seed, args.granules, quirks))
+        print(f'wrote {path}')
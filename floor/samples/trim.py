@@ -0,0 +1,98 @@
+'''
+---
+title: Trim a Real Congressional Record Package into a Sample
+---
+
+Cuts a real govinfo record (`CREC-YYYY-MM-DD.zip` from https://www.govinfo.gov/content/pkg/CREC-YYYY-MM-DD.zip, or the extracted directory) down to a few granules, so it can be checked in next to the synthetic samples and catch what they can't (whatever real markup does that generate.py doesn't know about)
+
+- keeps `--granules` htm files (spread evenly over the record, so every chamber tends to show up), plus one of each kind the parser skips (front matter, digest, unpaged)
+- keeps mods.xml whole (package-level `<extension>`, `congMember`s, ...) except for the `<relatedItem type="constituent">` entries of the granules that were dropped
+- writes `<out-dir>/<record>-real.zip` (the record directory inside keeps its real name)
+
+Then write its golden fixture with the baseline parser, check the current one against it, and commit both:
+
+    python trim.py ~/Downloads/CREC-2024-06-04.zip --granules 8
+    cd .. && python benchmark.py samples/CREC-2024-06-04-real.zip --update-golden --golden-ref $(git rev-list --max-parents=0 HEAD)
+    python benchmark.py
+
+usage: python trim.py path/to/CREC-YYYY-MM-DD[.zip] [--granules 8] [--out-dir .]
+'''
+# Python Standard Library
+import os, zipfile, argparse, posixpath
+
+# External Resources
+from lxml import etree
+
+skipped_kinds = ['FrontMatter', '-PgD', '-Pgnull'] # <-- granules the parser skips (see ParseCRDir.granule_paths)
+
+
+def read_record(path):
+    '''
+    (record name, {path relative to the record directory: bytes}) for a record zip or directory
+    '''
+    files = {}
+    if os.path.isdir(path):
+        root = os.path.normpath(path)
+        for directory, _, names in os.walk(root):
+            for name in names:
+                with open(os.path.join(directory, name), 'rb') as f:
+                    files[os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')] = f.read()
+        return os.path.basename(root), files
+    with zipfile.ZipFile(path) as zf:
+        mods = min((name for name in zf.namelist() if posixpath.basename(name) == 'mods.xml'), key = len)
+        root = posixpath.dirname(mods)
+        prefix = root + '/' if root else ''
+        for name in zf.namelist():
+            if name.startswith(prefix) and not name.endswith('/'):
+                files[name[len(prefix):]] = zf.read(name)
+    return posixpath.basename(root) or os.path.basename(path).split('.')[0], files
+
+
+def pick_granules(files, n):
+    granules = sorted(name for name in files if name.startswith('html/') and name.endswith('.htm'))
+    parsed = [name for name in granules if not any(kind in name for kind in skipped_kinds)]
+    step = max(1, len(parsed) // n) if n else len(parsed) + 1
+    keep = parsed[::step][:n]
+    for kind in skipped_kinds:
+        keep += [name for name in granules if kind in name][:1]
+    return keep
+
+
+def trim_mods(mods, access_ids):
+    '''
+    mods.xml without the constituent relatedItems of granules not in `access_ids`
+    '''
+    tree = etree.fromstring(mods, etree.XMLParser(remove_blank_text = False, huge_tree = True))
+    for item in tree.findall('{*}relatedItem'):
+        if item.get('type') != 'constituent':
+            continue
+        access_id = item.find('{*}extension/{*}accessId')
+        if (access_id is not None) and (access_id.text not in access_ids):
+            tree.remove(item)
+    return etree.tostring(tree, xml_declaration = True, encoding = 'UTF-8')
+
+
+def write_zip(path, record_name, files):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name in sorted(files):
+            info = zipfile.ZipInfo(f'{record_name}/{name}', date_time = (2024, 6, 1, 0, 0, 0)) # <-- fixed timestamps (as in generate.py)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, files[name])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Trim a real govinfo record down to a checked-in sample')
+    parser.add_argument('record', help = 'a CREC-YYYY-MM-DD.zip from govinfo, or the extracted directory')
+    parser.add_argument('--granules', type = int, default = 8, help = 'granules to keep (besides one of each skipped kind); default: 8')
+    parser.add_argument('--out-dir', default = os.path.dirname(os.path.abspath(__file__)), help = 'where to write the zip; default: next to this script')
+    args = parser.parse_args()
+
+    record_name, files = read_record(args.record)
+    keep = pick_granules(files, args.granules)
+    access_ids = set(posixpath.basename(name)[:-len('.htm')] for name in keep)
+    trimmed = {name: files[name] for name in keep}
+    trimmed['mods.xml'] = trim_mods(files['mods.xml'], access_ids)
+
+    path = os.path.join(args.out_dir, f'{record_name}-real.zip')
+    write_zip(path, record_name, trimmed)
+    print(f'wrote {path}: {len(keep)} granules, mods.xml {len(files["mods.xml"]):,} -> {len(trimmed["mods.xml"]):,} bytes')
@@ -0,0 +1,89 @@
+'''
+---
+title: Text Chunking Benchmark
+---
+
+Times `text.process` (cleaning + sentence tokenizing + chunking) in documents/sec, and checks the fast paths produce exactly what the original pipeline does
+
+- `reference`: every cleaner in `text.cleaners`, one after another, then Punkt; i.e. how chunks were made before `text.clean`
+- `serial`: `text.process_batch(source, texts)` (the fused cleaner)
+- `parallel`: `text.process_batch(source, texts, workers = N)`
+
+Both have to match the reference byte for byte; the script exits non-zero if any document differs. Documents are synthetic by default (seeded; full of the things the cleaners exist for: urls, `&amp;`, non-breaking spaces, `? ? ? ?` runs, underscores, initials, ...), or read from a jsonl file of `{"source": ..., "text": ...}` lines (e.g. dumped from the rhetoric tables).
+
+usage: python benchmark_text.py [--docs 5000] [--workers 4] [--jsonl path/to/texts.jsonl]
+'''
+# Python Standard Library
+import sys, json, time, random, argparse, collections, functools
+
+# Internal Dependencies
+import text
+
+words = 'the senator said our bill will lower costs for working families and secure the border while we protect social security medicare and veterans benefits'.split()
+noise = [
+    '\n', '\n\n', '  ', '   ', '\xa0', ' \xa0 ', '&amp;', 'https://t.co/Ab12Cd34', ' http://example.com/a?b=c ', '? ?', '? ? ? ?', ' ? ? ? ? ? ? ? ? ', '? \xa0?', '?\xa0?',
+    '[ ]', '___', '_', 'U.S.', 'H.R. 1234', 'Mr. Smith', 'Sen. Jones', 'M.A.C.', 'e.g.', 'S. 55', 'J.D. Vance', '...', '!', '?', 'Jan. 6', 'No. 3', 'a.m.', '#HR1', '@user',
+]
+
+
+def synthetic_text(rng):
+    parts = []
+    for _ in range(rng.randint(1, 12)):
+        sentence = [rng.choice(words) for _ in range(rng.randint(4, 25))]
+        for _ in range(rng.randint(0, 3)):
+            sentence.insert(rng.randrange(len(sentence) + 1), rng.choice(noise))
+        parts.append(' '.join(sentence).capitalize() + rng.choice(['.', '.', '!', '?', '']))
+    return rng.choice([' ', '  ', '\n', '\n\n']).join(parts)
+
+
+def synthetic_docs(n, seed = 0):
+    rng = random.Random(seed)
+    return [(source, synthetic_text(rng)) for source in text.process for _ in range(n // len(text.process))]
+
+
+def reference_process(source, doc):
+    cleaned = functools.reduce(lambda t, cleaner: cleaner(t), text.cleaners, doc)
+    sentences = text.tokenizer.tokenize(cleaned)
+    if source == 'floor':
+        return text.chunk(doc, sentences[1:], size = 2)
+    return text.chunk(doc, sentences, size = 100 if source.startswith('tweets') else 2)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Time text.process and check it against the original cleaning pipeline')
+    parser.add_argument('--docs', type = int, default = 5000, help = 'number of synthetic documents (split across sources); default: 5000')
+    parser.add_argument('--workers', type = int, default = 4, help = 'processes for the parallel run; default: 4')
+    parser.add_argument('--jsonl', default = None, help = 'read {"source", "text"} lines from this file instead of making documents up')
+    args = parser.parse_args()
+
+    if args.jsonl:
+        with open(args.jsonl, encoding = 'utf-8') as f:
+            docs = [(row['source'], row['text']) for row in map(json.loads, f)]
+    else:
+        docs = synthetic_docs(args.docs)
+    by_source = collections.defaultdict(list)
+    for source, doc in docs:
+        by_source[source].append(doc)
+
+    failed = False
+    totals = collections.Counter()
+    for source, texts in by_source.items():
+        cleaned = [text.clean(doc) for doc in texts]
+        reference_cleaned = [functools.reduce(lambda t, cleaner: cleaner(t), text.cleaners, doc) for doc in texts]
+        reference, reference_seconds = timed(lambda: [reference_process(source, doc) for doc in texts])
+        serial, serial_seconds = timed(lambda: text.process_batch(source, texts))
+        parallel, parallel_seconds = timed(lambda: text.process_batch(source, texts, workers = args.workers, chunksize = 64))
+
+        mismatches = sum(a != b for a, b in zip(cleaned, reference_cleaned)) + sum(a != b for a, b in zip(serial, reference)) + sum(a != b for a, b in zip(parallel, reference))
+        failed = failed or bool(mismatches) or (len(serial) != len(reference)) or (len(parallel) != len(reference))
+        totals.update({'docs': len(texts), 'reference': reference_seconds, 'serial': serial_seconds, 'parallel': parallel_seconds})
+        print(f'{source:<13} {len(texts):6d} docs | reference {len(texts) / reference_seconds:9.1f} docs/sec | serial {len(texts) / serial_seconds:9.1f} docs/sec | parallel ({args.workers}) {len(texts) / parallel_seconds:9.1f} docs/sec | {"output matches" if not mismatches else f"{mismatches} DIFFERENCES"}')
+
+    print(f'{"all":<13} {totals["docs"]:6d} docs | reference {totals["docs"] / totals["reference"]:9.1f} docs/sec | serial {totals["docs"] / totals["serial"]:9.1f} docs/sec | parallel ({args.workers}) {totals["docs"] / totals["parallel"]:9.1f} docs/sec')
+    sys.exit(1 if failed else 0)
@@ -20,6 +20,7 @@ import hjson
 # Internal Dependencies
 import llms
 import prompt
+import tokens
 from batch_monitor import save_batch_ids
 
 dotenv.load_dotenv('../../../env')
@@ -72,6 +73,10 @@ def prepare_batch_data_optimized(data):
     if final_with_messages < initial_with_messages:
         failed_prompts = initial_with_messages - final_with_messages
         print(f"⚠️  Removed {failed_prompts} additional items due to prompt creation failures")
+
+    # Size every request up front (so an oversize batch shows up here, rather than failing at OpenAI)
+    data['tokens'] = tokens.request_tokens(data['user_message'], prompt.system_prompt)
+    tokens.report(data)
     
     return data
 
@@ -98,6 +103,8 @@ Examples:
                        help='End date for classification (YYYY-MM-DD format, default: 7 days ago)')
     parser.add_argument('--batch-size', type=int, default=15000,
                        help='Number of items per batch (default: 15000, max: 50000)')
+    parser.add_argument('--max-batch-tokens', type=int, default=None,
+                       help="Most prompt tokens per submitted batch file, e.g. the org's enqueued-token limit for the model (default: no limit)")
     
     args = parser.parse_args()
     
@@ -129,6 +136,7 @@ Examples:
         conn.table('classifications')
         .select([
             'id',
+            'source',
             'text',
             'date',
             'classified',
@@ -190,7 +198,8 @@ Examples:
             batch_data, 
             "classification", 
             prompt.system_prompt,
-            "gpt-4o"
+            "gpt-4o",
+            max_tokens = args.max_batch_tokens,
         )
         
         print(f'Batch submitted with IDs: {batch_ids}')
@@ -5,6 +5,9 @@ import sys, json, urllib, datetime, os
 import dotenv
 import dataset as database
 
+# Internal Deps
+import watermarks
+
 # Setup
 dotenv.load_dotenv('../../env')
 dotenv.load_dotenv(os.environ['PATH_TO_SECRETS'])
@@ -16,3 +19,15 @@ with database.connect(params) as dbx:
     table.create_column('source', dbx.types.string(50))
     table.create_column('source_id', dbx.types.integer)
     table.create_column('errors', dbx.types.json)
+    table.create_index(['source', 'source_id']) # <-- what insert's "not classified yet" check (NOT EXISTS) looks rows up by
+
+    for source in ['floor', 'tweets', 'statements', 'newsletters', 'tweets_state']:
+        dbx[source].create_index(['date']) # <-- what insert finds the first id in its lookback window with (see watermarks.first_id)
+
+    table = dbx.create_table('classifications_watermarks', primary_id = 'source', primary_type = dbx.types.string(50)) # <-- see watermarks.py
+    table.create_column('max_source_id', dbx.types.integer)
+    table.create_column('updated_at', dbx.types.datetime)
+
+dbx = database.connect(params)
+watermarks.init(dbx) # <-- classifications_pending (see watermarks.py)
+dbx.engine.dispose(); dbx.close()
@@ -1,11 +1,16 @@
 '''
+Chunks new rows from the rhetoric tables and inserts the chunks into `classifications`
 
-# Todo:
-- this script scans the db table for each date from now until around the first date we have date. EVERY TIME. there should be a better way to do this (start from current date... if any in classif, stop)
-    - ^ or actually, just set the "until" date (beginning_date)
+"New" is tracked per source with a high-water mark (see watermarks.py): each run reads the rows past the mark (plus the last week of dates, and the rows the mark passed before they had text), and the mark advances in the same transaction as every insert. `--rebuild-from YYYY-MM-DD` deletes the chunks dated then or later and makes them again (e.g. after changing the cleaners in text.py).
+
+NOTE: a rebuild destroys those rows of `classifications`, llm classifications and all; they're made again unclassified, and classify.py has to send every one of them to the api again (and pay for it). So on its own, `--rebuild-from` only prints how many chunks it would delete; add `--yes` to actually do it.
+
+usage:
+    python insert.py
+    python insert.py --rebuild-from 2025-01-01 [--yes]
 '''
 # Python Standard Library
-import sys, json, urllib, datetime, os
+import sys, json, urllib, datetime, os, argparse
 
 # External Dependencies
 import dotenv
@@ -18,6 +23,7 @@ from ibis import _
 
 # Internal Dependencies
 import text
+import watermarks
 
 # Setup
 dotenv.load_dotenv('../../env')
@@ -41,76 +47,79 @@ federal_tables = [
 ]
 state_tables = ['tweets_state']
 
-# Chunk text data, then load it into the Database
-today = datetime.date(year=2017,month=6,day=25)# datetime.date.today()
-beginning_date = datetime.date(year=2017,month=6,day=21)
-# beginning_date = datetime.date(year=2025,month=1,day=1)
-# beginning_date = datetime.date(year=2022,month=8,day=1) # <-- go back to the beginning
+rows_per_insert = 1000 # <-- source rows chunked and inserted (and the watermark advanced) per transaction
+
+parser = argparse.ArgumentParser(description = 'Chunk new rhetoric rows and insert them into classifications')
+parser.add_argument('--rebuild-from', type = watermarks.parse_date, default = None, help = 'YYYY-MM-DD; delete the chunks dated then or later (and their classifications) and make them again (e.g. after changing the cleaners); only a dry run without --yes; default: None')
+parser.add_argument('--yes', action = 'store_true', help = 'really delete the chunks for --rebuild-from')
+args = parser.parse_args()
+
+# Read the high-water marks (and, for a rebuild, clear out the chunks being redone)
+dbx = dataset.connect(params)
+watermarks.init(dbx) # <-- (classifications_pending, the first time)
+if args.rebuild_from:
+    with dbx as tx:
+        for source in federal_tables + state_tables:
+            print(f'---rebuilding {source} from {args.rebuild_from}: {"deleted" if args.yes else "would delete"} {watermarks.rebuild(tx, source, args.rebuild_from, confirmed = args.yes)} chunks (and their classifications)---')
+    if not args.yes:
+        print('nothing deleted; rerun with --yes to delete these and classify them again')
+        sys.exit()
+marks = watermarks.read(dbx)
+dbx.engine.dispose(); dbx.close()
+pending = conn.table(watermarks.pending_table_name) # <-- (exists now; see watermarks.init)
+since = args.rebuild_from or (datetime.date.today() - watermarks.lookback) # <-- rows dated since then are checked even if they're below the mark
 
+# Chunk text data, then load it into the Database
 print('start')
-for d, day in enumerate(range((today - beginning_date).days + 1)):
-    target_date = today - datetime.timedelta(days = day) # <-- start from lastest date (go backward)
-    # print(target_date)
-
-    # source_classifications = classifications.filter(classifications.source == source)
-    for source in federal_tables + state_tables:
-        source_table = conn.table(source)
-        ids_for_date = (
-            source_table
-            .filter([_.date == target_date, _.text.notnull()])
-            .select([_.id, _.date])
-            .execute()
-        )
-
-        if not ids_for_date.empty:
-
-            clsf_in_ids_for_date = (
-                classifications
-                .filter(classifications.source == source)
-                .group_by(_.source_id)
-                .aggregate()
-                .filter(_.source_id.isin(ids_for_date['id'].values))
-                .execute()
-            )
-
-            missing_ids = ids_for_date[~ids_for_date['id'].isin(clsf_in_ids_for_date['source_id'])]
-
-            if not missing_ids.empty:
-
-                if source in state_tables:
-                    items = (
-                        source_table
-                        .select([_.id, _.openstates_id, _.text, _.date])
-                        .filter([_.date == target_date, _.id.isin(missing_ids['id'].values)])
-                        .execute()
-                    )
-                else:
-                    items = (
-                        source_table
-                        .select([_.id, _.bioguide_id, _.text, _.date])
-                        .filter([_.date == target_date, _.id.isin(missing_ids['id'].values)])
-                        .execute()
-                    )
-
-                # split into chunks
-                items['text'] = items['text'].apply(lambda x: text.process[source](x))
-
-                # expand dataframe so each chunk gets their own row
-                items = items.explode('text', ignore_index = True)
-
-                items['source'] = source
-                items.rename(columns = {'id': 'source_id'}, inplace = True)
-                items['errors'] = items.apply(lambda row: {}, axis = 1).astype(object)
-                items = items.fillna(np.nan).replace([np.nan], [None])
-
-                dbx = dataset.connect(params)
-                dbx['classifications'].insert_many(
-                    items.to_dict(orient = 'records'),
-                )
-                dbx.engine.dispose(); dbx.close()
-
-                print(f'---pushed {items.shape[0]} items from {source} for date {target_date}---')
+for source in federal_tables + state_tables:
+    source_table = conn.table(source)
+    source_classifications = classifications.filter(classifications.source == source)
+    source_pending = pending.filter(pending.source == source)
+
+    # rows held below the mark (see watermarks.hold), e.g. statements whose text was scraped after the mark passed them
+    held = source_table.filter(_.text.notnull()).semi_join(source_pending, source_table.id == source_pending.source_id)
+    row_sets = [held]
+
+    first_recent_id = source_table.filter(_.date >= since).id.min().execute() # <-- an index seek on date
+    start_id = watermarks.first_id(marks.get(source), None if pd.isna(first_recent_id) else int(first_recent_id))
+    if start_id is not None:
+        # rows past the mark, or recent ones (starting at start_id, so this is a range on id rather than the whole table)
+        if source in marks:
+            rows = source_table.filter([_.id >= start_id, (_.id > marks[source]) | (_.date >= since), _.text.notnull()])
+        else:
+            rows = source_table.filter([_.id >= start_id, _.date >= since, _.text.notnull()])
+        row_sets.append(rows.anti_join(source_pending, rows.id == source_pending.source_id)) # <-- (held rows are read above)
+
+    for rows in row_sets:
+        # rows with no classifications yet (one anti-join, done by the db)
+        rows = rows.anti_join(source_classifications, rows.id == source_classifications.source_id)
+
+        if source in state_tables:
+            items = rows.select([_.id, _.openstates_id, _.text, _.date]).order_by(_.id).execute()
+        else:
+            items = rows.select([_.id, _.bioguide_id, _.text, _.date]).order_by(_.id).execute()
+
+        for start in range(0, items.shape[0], rows_per_insert):
+            batch = items.iloc[start:start + rows_per_insert].copy()
+
+            # split into chunks
+            batch['text'] = batch['text'].apply(lambda x: text.process[source](x))
+
+            # expand dataframe so each chunk gets their own row
+            batch = batch.explode('text', ignore_index = True)
+
+            batch['source'] = source
+            batch.rename(columns = {'id': 'source_id'}, inplace = True)
+            batch['errors'] = batch.apply(lambda row: {}, axis = 1).astype(object)
+            batch = batch.fillna(np.nan).replace([np.nan], [None])
+            records = batch.to_dict(orient = 'records')
+
+            dbx = dataset.connect(params)
+            with dbx as tx: # <-- the chunks and the watermark go in together
+                tx['classifications'].insert_many(records)
+                watermarks.advance(tx, records)
+            dbx.engine.dispose(); dbx.close()
+
+            print(f'---pushed {len(records)} items from {source} (ids up to {records[-1]["source_id"]})---')
 
 print('end')
-
-
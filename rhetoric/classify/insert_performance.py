@@ -3,16 +3,21 @@ PERFORMANCE-OPTIMIZED INSERT SCRIPT
 
 Major optimizations:
 1. Bulk date range processing (not day-by-day)
-2. Single LEFT JOIN query instead of N+1 pattern  
+2. Single anti-join query (NOT EXISTS against classifications, keyset-paginated) instead of N+1 pattern and client-side id lists
 3. Connection reuse throughout script
 4. Batch all sources into single insert operation
 5. Reduced from ~125 queries to ~6 queries for same date range
+6. Sources processed in parallel (one thread and db connection each; sentence tokenizing in a shared process pool), with chunks streamed to the inserter in fixed-size batches as they're made
+7. Incremental: only source rows past each source's high-water mark (plus the last week, and the rows the mark passed before they had text) are read; the mark advances with every inserted batch (see watermarks.py)
 
 Expected speedup: 15-20x faster
+
+usage: python insert_performance.py [--rebuild-from 2025-01-01 [--yes]]  # <-- see insert.py: a rebuild deletes classifications; without --yes it only counts them
 '''
 
 # Python Standard Library
-import sys, json, urllib, datetime, os, time
+import sys, json, urllib, datetime, os, time, queue, argparse, threading, multiprocessing
+import concurrent.futures
 
 # External Dependencies
 import dotenv
@@ -20,12 +25,11 @@ import numpy as np
 import pandas as pd
 import sqlalchemy as sql
 import dataset
-import ibis
 import datetime
-from ibis import _
 
 # Internal Dependencies
 import text
+import watermarks
 
 # Setup
 dotenv.load_dotenv('../../../env')
@@ -36,15 +40,9 @@ else:
 
 ## DB Credentials
 params = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
-conn = ibis.mysql.connect(
-    host = os.environ['DB_HOST'],
-    user = os.environ['DB_USER'],
-    password = os.environ['DB_PASSWORD'],
-    database = 'elite',
-    connect_timeout = 6000,
-    read_timeout = 3000,
-    write_timeout = 3000,
-)
+def connect():
+    """A new engine (one per source worker, so each has its own connections)"""
+    return sql.create_engine(params + "?charset=utf8mb4&connect_timeout=60&read_timeout=3000&write_timeout=300", pool_pre_ping = True)
 
 federal_tables = [
     'floor',
@@ -54,298 +52,269 @@ federal_tables = [
 ]
 state_tables = ['tweets_state']
 
-# Date range configuration
+text_workers = os.cpu_count() or 1 # <-- processes for sentence tokenizing (see text.process_batch)
+insert_batch_size = 10000 # <-- records per insert; also what bounds memory, since records are inserted as they're made
+missing_page_size = 25000 # <-- source rows read per page (text is the heavy part)
+
+# Date range configuration (rows dated since then are checked even if they're below the watermark)
 today = datetime.date.today()
-beginning_date = datetime.date.today() - datetime.timedelta(weeks=1)
+beginning_date = today - watermarks.lookback
 
-def process_source_optimized(source, start_date, end_date):
+def chunk_records(source, items, pool = None):
     """
-    Process a single source for entire date range using optimized queries
-    Uses the exact same pattern as insert.py but for date ranges instead of single dates
+    Split a batch of source rows (id, author id, text, date) into text chunks, returning one classifications record per chunk (same as insert.py)
     """
-    print(f'Processing {source} for date range {start_date} to {end_date}...')
+    # Process text chunks (same as insert.py, but the whole batch at once, across processes)
+    items['text'] = text.process_batch(source, items['text'], pool = pool)
     
-    try:
-        source_table = conn.table(source)
-        
-        # Step 1: Get all IDs for the date range (with retry logic for large queries)
-        max_retries = 3
+    # Expand dataframe so each chunk gets its own row  
+    items = items.explode('text', ignore_index=True)
+    
+    # Add metadata (same as insert.py)
+    items['source'] = source
+    items.rename(columns={'id': 'source_id'}, inplace=True)
+    items['errors'] = items.apply(lambda row: {}, axis=1).astype(object)
+    items = items.fillna(np.nan).replace([np.nan], [None])
+    return items.to_dict(orient='records')
+
+def missing_items(engine, source, since, mark = None, page_size = missing_page_size):
+    """
+    Source rows with text and no classifications yet, as DataFrames of up to `page_size` rows (id, author id, text, date), in id order: first the rows held below the mark (see watermarks.hold; e.g. statements whose text was scraped after the mark passed them, dated or not), then the ones past the high-water `mark` (if there is one) or dated `since` or later
+
+    The database answers "which ones are missing" itself (NOT EXISTS against classifications), so no id lists go back and forth. Pages are keyset-paginated on id (each picks up after the last id of the one before, so a retry resumes where it left off rather than starting over) and read through a server-side cursor. Past the mark, the first page starts at watermarks.first_id (found with an index seek on date), so no run reads from the start of the table; held rows are looked up by id.
+    """
+    author = 'openstates_id' if source in state_tables else 'bioguide_id' # <-- state tables use openstates_id
+    items = sql.table(source, sql.column('id', sql.Integer), sql.column(author), sql.column('text'), sql.column('date', sql.Date))
+    classifications = sql.table('classifications', sql.column('source'), sql.column('source_id', sql.Integer))
+    query = (
+        sql.select(items.c.id, items.c[author], items.c.text, items.c.date)
+        .where(
+            items.c.text.is_not(None),
+            ~sql.exists().where(classifications.c.source == source, classifications.c.source_id == items.c.id),
+        )
+        .order_by(items.c.id)
+        .limit(page_size)
+    )
+    held = items.c.id.in_(watermarks.pending_query(source))
+
+    yield from read_pages(engine, source, query.where(held), 0, page_size)
+
+    with engine.connect() as conn:
+        first_recent_id = conn.execute(sql.select(sql.func.min(items.c.id)).where(items.c.date >= since)).scalar()
+    start_id = watermarks.first_id(mark, first_recent_id)
+    if start_id is None:
+        return
+    recent = (items.c.date >= since) if mark is None else sql.or_(items.c.id > mark, items.c.date >= since)
+    yield from read_pages(engine, source, query.where(recent, ~held), start_id - 1, page_size) # <-- (held rows were just read)
+
+def read_pages(engine, source, query, last_id, page_size):
+    """
+    Pages of `query` (ordered by id, limited to `page_size`) past `last_id`, retrying lost connections
+    """
+    items = query.selected_columns
+    max_retries = 3
+    page_num = 0
+    while True:
+        page_num += 1
         retry_count = 0
-        ids_for_range = None
-        
         while retry_count < max_retries:
             try:
-                ids_query = (
-                    source_table
-                    .filter([_.date >= start_date, _.date <= end_date, _.text.notnull()])
-                    .select([_.id, _.date])
-                )
-                
-                # Execute query safely with timeout handling
-                ids_for_range = ids_query.execute()
+                with engine.connect() as conn:
+                    result = conn.execution_options(stream_results = True).execute(query.where(items.id > last_id))
+                    page = pd.DataFrame(result.fetchall(), columns = list(result.keys()))
                 break
-                
+
             except Exception as e:
                 retry_count += 1
                 error_msg = str(e)
-                
+
                 if 'connection' in error_msg.lower() or 'server has gone away' in error_msg.lower():
                     if retry_count < max_retries:
                         wait_time = retry_count * 3
-                        print(f'  ⚠️  Query retry {retry_count}/{max_retries} for {source}: {error_msg[:60]}...')
-                        print(f'     Waiting {wait_time} seconds before retry...')
+                        print(f'    ⚠️  Page {page_num} retry {retry_count}/{max_retries} for {source}: {error_msg[:60]}...')
+                        print(f'       Waiting {wait_time} seconds before retry...')
                         time.sleep(wait_time)
                     else:
-                        print(f'  ❌ Query failed after {max_retries} retries: {error_msg[:100]}...')
+                        print(f'    ❌ Page {page_num} failed after {max_retries} retries: {error_msg[:100]}...')
                         raise
                 else:
                     raise
+
+        if page.empty:
+            return
+        print(f'    Retrieved page {page_num} ({len(page)} new items for {source})...')
+        yield page
+        if len(page) < page_size:
+            return
+        last_id = int(page['id'].iloc[-1])
+
+def process_source_optimized(source, since, mark = None, pool = None):
+    """
+    Process a single source's new rows (past its high-water mark, or dated since `since`) using optimized queries
+    Uses the exact same pattern as insert.py but for date ranges instead of single dates
+
+    A generator: yields lists of classifications records as each page of new source rows is retrieved and split (so they can be inserted while the rest is still being read)
+    """
+    print(f'Processing {source} past id {mark} and from {since} on...')
+    
+    engine = connect()
+    try:
+        new_items, processed = 0, 0
+        for items in missing_items(engine, source, since, mark):
+            new_items += len(items)
+            records = chunk_records(source, items, pool)
+            processed += len(records)
+            yield records
         
-        if ids_for_range is None or ids_for_range.empty:
-            print(f'  No items found for {source} in date range')
-            return []
-        
-        print(f'  Found {len(ids_for_range)} total items for {source}')
-        
-        # If dataset is very large (>100K), consider chunking by month to avoid timeouts
-        if len(ids_for_range) > 100000:
-            print(f'  ⚠️  Large dataset detected ({len(ids_for_range)} records)')
-            print(f'     This may take longer due to MySQL timeout limits')
-            print(f'     Consider reducing date range if issues persist')
-        
-        # Step 2: Check which IDs already exist in classifications (with chunking for large datasets)
-        id_list = ids_for_range['id'].tolist()
-        existing_ids = []
-        
-        # Process in chunks if dataset is large to avoid timeout
-        chunk_size = 50000  # Process 50K IDs at a time
-        id_chunks = [id_list[i:i + chunk_size] for i in range(0, len(id_list), chunk_size)]
-        
-        print(f'  Checking existing classifications in {len(id_chunks)} chunk(s)...')
-        
-        for chunk_idx, id_chunk in enumerate(id_chunks):
-            print(f'    Processing chunk {chunk_idx + 1}/{len(id_chunks)} ({len(id_chunk)} IDs)...')
-            retry_count = 0
-            chunk_existing = None
-            
-            while retry_count < max_retries:
-                try:
-                    classifications = conn.table('classifications')
-                    
-                    chunk_clsf = (
-                        classifications
-                        .filter(_.source == source)
-                        .group_by(_.source_id)
-                        .aggregate()
-                        .filter(_.source_id.isin(id_chunk))
-                        .execute()
-                    )
-                    
-                    if not chunk_clsf.empty:
-                        chunk_existing = chunk_clsf['source_id'].tolist()
-                        existing_ids.extend(chunk_existing)
-                    
-                    break
-                    
-                except Exception as e:
-                    retry_count += 1
-                    error_msg = str(e)
-                    
-                    if 'connection' in error_msg.lower() or 'server has gone away' in error_msg.lower():
-                        if retry_count < max_retries:
-                            wait_time = retry_count * 3
-                            print(f'    ⚠️  Chunk {chunk_idx + 1} retry {retry_count}/{max_retries}: {error_msg[:60]}...')
-                            print(f'       Waiting {wait_time} seconds before retry...')
-                            time.sleep(wait_time)
-                        else:
-                            print(f'    ❌ Chunk {chunk_idx + 1} failed after {max_retries} retries: {error_msg[:100]}...')
-                            raise
-                    else:
-                        raise
-        
-        print(f'  Found {len(existing_ids)} existing classifications for {source}')
-        
-        # Step 3: Find missing IDs
-        missing_ids = ids_for_range[~ids_for_range['id'].isin(existing_ids)]
-        
-        if missing_ids.empty:
+        if not new_items:
             print(f'  No new items found for {source}')
-            return []
-        
-        print(f'  Found {len(missing_ids)} new items for {source}')
-        
-        # Step 4: Get full records for missing IDs (with chunking for large datasets)
-        missing_id_list = missing_ids['id'].tolist()
-        
-        if not missing_id_list:
-            print(f'  No missing IDs to process for {source}')
-            return []
+            return
         
-        # Process missing IDs in chunks to avoid memory/timeout issues
-        chunk_size = 25000  # Smaller chunks for text retrieval (memory intensive)
-        missing_chunks = [missing_id_list[i:i + chunk_size] for i in range(0, len(missing_id_list), chunk_size)]
-        
-        print(f'  Retrieving records in {len(missing_chunks)} chunk(s)...')
-        all_missing_items = []
-        
-        for chunk_idx, missing_chunk in enumerate(missing_chunks):
-            print(f'    Retrieving chunk {chunk_idx + 1}/{len(missing_chunks)} ({len(missing_chunk)} records)...')
-            retry_count = 0
-            chunk_items = None
-            
-            while retry_count < max_retries:
-                try:
-                    if source in state_tables:
-                        # State tables use openstates_id
-                        items_query = (
-                            source_table
-                            .filter(_.id.isin(missing_chunk))
-                            .select([_.id, _.openstates_id, _.text, _.date])
-                        )
-                    else:
-                        # Federal tables use bioguide_id  
-                        items_query = (
-                            source_table
-                            .filter(_.id.isin(missing_chunk))
-                            .select([_.id, _.bioguide_id, _.text, _.date])
-                        )
-                    
-                    chunk_items = items_query.execute()
-                    
-                    if not chunk_items.empty:
-                        all_missing_items.append(chunk_items)
-                    
-                    break
-                    
-                except Exception as e:
-                    retry_count += 1
-                    error_msg = str(e)
-                    
-                    if 'connection' in error_msg.lower() or 'server has gone away' in error_msg.lower():
-                        if retry_count < max_retries:
-                            wait_time = retry_count * 3
-                            print(f'    ⚠️  Chunk {chunk_idx + 1} retry {retry_count}/{max_retries}: {error_msg[:60]}...')
-                            print(f'       Waiting {wait_time} seconds before retry...')
-                            time.sleep(wait_time)
-                        else:
-                            print(f'    ❌ Chunk {chunk_idx + 1} failed after {max_retries} retries: {error_msg[:100]}...')
-                            raise
-                    else:
-                        raise
-        
-        # Combine all chunks
-        if all_missing_items:
-            missing_items = pd.concat(all_missing_items, ignore_index=True)
-        else:
-            print(f'  No records retrieved for {source}')
-            return []
-        
-        # Step 5: Process text chunks (same as insert.py)
-        missing_items['text'] = missing_items['text'].apply(lambda x: text.process[source](x))
-        
-        # Step 6: Expand dataframe so each chunk gets its own row  
-        missing_items = missing_items.explode('text', ignore_index=True)
-        
-        # Step 7: Add metadata (same as insert.py)
-        missing_items['source'] = source
-        missing_items.rename(columns={'id': 'source_id'}, inplace=True)
-        missing_items['errors'] = missing_items.apply(lambda row: {}, axis=1).astype(object)
-        missing_items = missing_items.fillna(np.nan).replace([np.nan], [None])
-        
-        print(f'  Processed {len(missing_items)} text chunks for {source}')
-        return missing_items.to_dict(orient='records')
+        print(f'  Processed {new_items} new items into {processed} text chunks for {source}')
         
     except Exception as e:
         print(f'  ❌ Error processing {source}: {str(e)[:100]}...')
-        return []
 
-def process_all_sources_sequential(sources, start_date, end_date):
+    finally:
+        engine.dispose()
+
+def insert_batch(batch, batch_num):
     """
-    Process all sources sequentially (safer than parallel for database operations)
+    Insert one batch of classifications records, with retry logic to avoid timeout
+
+    The sources' high-water marks are advanced in the same transaction, so they only ever cover committed records
     """
-    print(f'\n📊 SEQUENTIAL PROCESSING: {len(sources)} sources')
-    
-    all_new_records = []
+    max_retries = 3
+    retry_count = 0
     
-    for source in sources:
+    while retry_count < max_retries:
         try:
-            records = process_source_optimized(source, start_date, end_date)
-            all_new_records.extend(records)
-            print(f'  ✅ Completed {source}: {len(records)} records')
+            # Create fresh connection for each batch with timeouts (same as insert.py)
+            dbx_batch = dataset.connect(params + "?charset=utf8mb4&connect_timeout=60&read_timeout=300&write_timeout=300")
+            
+            # Insert batch (and advance the watermarks)
+            with dbx_batch as tx:
+                tx['classifications'].insert_many(batch)
+                watermarks.advance(tx, batch)
+            
+            # Close connection immediately
+            dbx_batch.engine.dispose()
+            dbx_batch.close()
+            return
+            
         except Exception as e:
-            print(f'  ❌ Error processing {source}: {str(e)[:100]}...')
+            retry_count += 1
+            error_msg = str(e)
+            
+            if retry_count < max_retries:
+                wait_time = retry_count * 2  # Exponential backoff
+                print(f"  ⚠️  Batch {batch_num} failed (attempt {retry_count}/{max_retries}): {error_msg[:100]}...")
+                print(f"     Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+            else:
+                print(f"  ❌ Batch {batch_num} failed after {max_retries} attempts: {error_msg}")
+                raise
+
+def batch_end(batch, batch_size):
+    """
+    Where to cut the next batch: `batch_size` records, plus any more chunks of the last source row (a row's chunks go in together, so a watermark never covers a half-inserted row)
+    """
+    end = min(batch_size, len(batch))
+    while (end < len(batch)) and ((batch[end]['source'], batch[end]['source_id']) == (batch[end - 1]['source'], batch[end - 1]['source_id'])):
+        end += 1
+    return end
+
+def process_all_sources_parallel(sources, since, marks, batch_size = insert_batch_size):
+    """
+    Process every source at once (each in its own thread, with its own db connection; sentence tokenizing shared out over one process pool), inserting records `batch_size` at a time as they come in
+
+    Only a few chunks' worth of records are ever held (the queue between the sources and the inserter is bounded), so memory doesn't grow with the date range; and the run takes as long as the slowest source, rather than all of them added up.
+    """
+    print(f'\n📊 PARALLEL PROCESSING: {len(sources)} sources')
     
-    return all_new_records
+    done = object() # <-- what a source's worker puts on the queue when it's finished
+    records = queue.Queue(maxsize = 2 * len(sources))
+    counts = dict.fromkeys(sources, 0)
+    stop = threading.Event() # <-- set if inserting fails, so the other sources stop early
 
-def main():
+    def worker(source, pool):
+        try:
+            for chunk in process_source_optimized(source, since, marks.get(source), pool = pool):
+                if stop.is_set():
+                    break
+                records.put((source, chunk))
+        finally:
+            records.put((source, done))
+
+    total_inserted, batch_num, batch = 0, 0, []
+    with multiprocessing.Pool(text_workers) as pool, concurrent.futures.ThreadPoolExecutor(max_workers = len(sources)) as executor: # <-- pool first: forking after the threads start isn't safe
+        for source in sources:
+            executor.submit(worker, source, pool)
+
+        running = len(sources)
+        try:
+            while running:
+                source, chunk = records.get()
+                if chunk is done:
+                    running -= 1
+                    print(f'  ✅ Completed {source}: {counts[source]} records')
+                else:
+                    counts[source] += len(chunk)
+                    batch.extend(chunk)
+
+                # OPTIMIZATION: Batch insert as soon as there's a full batch (and whatever's left at the end)
+                while (len(batch) >= batch_size) or (batch and not running):
+                    batch_num += 1
+                    end = batch_end(batch, batch_size)
+                    insert_batch(batch[:end], batch_num)
+                    total_inserted += end
+                    print(f"  ✅ Inserted batch {batch_num} ({end} records, {total_inserted} total)")
+                    batch = batch[end:]
+        except:
+            stop.set()
+            while running: # <-- let the workers finish (they may be waiting on a full queue)
+                if records.get()[1] is done:
+                    running -= 1
+            raise
+    
+    return total_inserted
+
+def main(rebuild_from = None, confirmed = False):
     """
     Main optimized insertion process
+
+    `rebuild_from` (a date): delete every chunk dated then or later first (classifications and all), and chunk those rows again (e.g. after changing the text cleaners); unless `confirmed`, just print how many chunks that would delete and stop
     """
+    since = rebuild_from or beginning_date
     print('=' * 60)
     print('PERFORMANCE-OPTIMIZED INSERT SCRIPT')
     print('=' * 60)
-    print(f'Date range: {beginning_date} to {today}')
-    print(f'Total days: {(today - beginning_date).days + 1}')
     print(f'Sources: {federal_tables + state_tables}')
     
     try:
-        print('\n🔌 Connecting to database...')
-        
         all_sources = federal_tables + state_tables
+
+        # Read the high-water marks (and, for a rebuild, clear out the chunks being redone)
+        dbx = dataset.connect(params + "?charset=utf8mb4")
+        watermarks.init(dbx) # <-- (classifications_pending, the first time)
+        if rebuild_from:
+            with dbx as tx:
+                for source in all_sources:
+                    print(f'  🗑️  Rebuilding {source} from {rebuild_from}: {"deleted" if confirmed else "would delete"} {watermarks.rebuild(tx, source, rebuild_from, confirmed = confirmed)} chunks (and their classifications)')
+            if not confirmed:
+                print('\n💡 Nothing deleted; rerun with --yes to delete these and classify them again')
+                dbx.engine.dispose(); dbx.close()
+                return 0
+        marks = watermarks.read(dbx)
+        dbx.engine.dispose(); dbx.close()
+        print(f'Watermarks: {marks}')
+        print(f'Also checking rows dated {since} to {today}')
         
-        # Use sequential processing to avoid memory corruption issues
-        all_new_records = process_all_sources_sequential(
-            all_sources, beginning_date, today
+        total_inserted = process_all_sources_parallel(
+            all_sources, since, marks, batch_size = insert_batch_size
         )
         
-        # OPTIMIZATION: Batch insert with retry logic (same as insert.py)
-        if all_new_records:
-            print(f'\n💾 BULK INSERT: {len(all_new_records)} total records')
-            
-            # Process in batches with retry logic to avoid timeout
-            batch_size = 10000
-            total_batches = (len(all_new_records) + batch_size - 1) // batch_size
-            total_inserted = 0
-            max_retries = 3
-            
-            for i in range(0, len(all_new_records), batch_size):
-                batch = all_new_records[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
-                retry_count = 0
-                
-                while retry_count < max_retries:
-                    try:
-                        # Create fresh connection for each batch with timeouts (same as insert.py)
-                        dbx_batch = dataset.connect(params + "?charset=utf8mb4&connect_timeout=60&read_timeout=300&write_timeout=300")
-                        
-                        # Insert batch
-                        dbx_batch['classifications'].insert_many(batch)
-                        
-                        # Close connection immediately
-                        dbx_batch.engine.dispose()
-                        dbx_batch.close()
-                        
-                        total_inserted += len(batch)
-                        print(f"  ✅ Inserted batch {batch_num}/{total_batches} ({len(batch)} records, {total_inserted}/{len(all_new_records)} total)")
-                        break
-                        
-                    except Exception as e:
-                        retry_count += 1
-                        error_msg = str(e)
-                        
-                        if retry_count < max_retries:
-                            wait_time = retry_count * 2  # Exponential backoff
-                            print(f"  ⚠️  Batch {batch_num} failed (attempt {retry_count}/{max_retries}): {error_msg[:100]}...")
-                            print(f"     Retrying in {wait_time} seconds...")
-                            time.sleep(wait_time)
-                        else:
-                            print(f"  ❌ Batch {batch_num} failed after {max_retries} attempts: {error_msg}")
-                            raise
-                
-                # Brief pause between batches
-                if i + batch_size < len(all_new_records):
-                    time.sleep(0.1)
-            
+        if total_inserted:
             print(f'✅ Successfully inserted {total_inserted} new records')
         else:
             print('\n💡 No new records to insert')
@@ -359,4 +328,8 @@ def main():
         print('🔌 All database connections closed')
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = 'Chunk new rhetoric rows and insert them into classifications')
+    parser.add_argument('--rebuild-from', type = watermarks.parse_date, default = None, help = 'YYYY-MM-DD; delete the chunks dated then or later (and their classifications) and make them again (e.g. after changing the cleaners); only a dry run without --yes; default: None')
+    parser.add_argument('--yes', action = 'store_true', help = 'really delete the chunks for --rebuild-from')
+    args = parser.parse_args()
+    main(rebuild_from = args.rebuild_from, confirmed = args.yes)
@@ -2,6 +2,8 @@ import sys, time, json, os, copy, tempfile, subprocess
 import pandas as pd
 import openai
 
+import tokens
+
 
 
 # Exponential Backoff Decorator
@@ -68,8 +70,12 @@ def chatgpt_with_system(user_message, system_message, model = 'o4-mini'):
     return response
 
 
-def send_batch_with_system(data, prompt_name, system_prompt, model):
-    """Send batch with system prompt for better efficiency"""
+def send_batch_with_system(data, prompt_name, system_prompt, model, max_tokens = None):
+    """
+    Send batch with system prompt for better efficiency
+
+    Requests are packed into as few batch files as fit OpenAI's limits on requests and bytes, and (if `max_tokens` is given, e.g. your enqueued-token limit for the model) on prompt tokens; uses data['tokens'] if it's there (see tokens.request_tokens), otherwise counts them here.
+    """
     
     records = data.apply(
         lambda entry: {
@@ -98,39 +104,23 @@ def send_batch_with_system(data, prompt_name, system_prompt, model):
     # OpenAI Batch API limits: 50,000 requests and 200MB per batch
     max_requests_per_batch = 50000
     max_file_size = 209715200  # 200MB in bytes
-    
-    batches = []
-    
-    # Split data if it exceeds request limit
-    if len(records) > max_requests_per_batch:
-        print(f'SPLITTING BY REQUEST COUNT: {len(records)} requests > {max_requests_per_batch} limit')
-        for i in range(0, len(records), max_requests_per_batch):
-            chunk = records.iloc[i:i + max_requests_per_batch]
-            
-            with tempfile.NamedTemporaryFile() as file:
-                chunk.to_json(file.name, orient = 'records', lines = True)
-                batch_id = api_call(file.name, prompt = prompt_name)
-                batches.append(batch_id)
-                print(f'  Submitted batch chunk {i//max_requests_per_batch + 1} with {len(chunk)} requests')
+
+    lines = [(json.dumps(record) + '\n').encode('utf-8') for record in records]
+    request_tokens = data['tokens'].tolist() if 'tokens' in data else tokens.request_tokens(data['user_message'], system_prompt)
+    slices = tokens.pack([len(line) for line in lines], request_tokens, max_requests = max_requests_per_batch, max_bytes = max_file_size, max_tokens = max_tokens)
+    if len(slices) > 1:
+        print(f'SPLITTING: {len(lines)} requests, {sum(map(len, lines))} bytes, {sum(request_tokens)} tokens -> {len(slices)} batches')
     else:
-        # Check file size and split if needed
+        print('NO SPLIT NEEDED')
+
+    batches = []
+    for b, (start, end) in enumerate(slices):
         with tempfile.NamedTemporaryFile() as file:
-            records.to_json(file.name, orient = 'records', lines = True)
-            if os.path.getsize(file.name) > max_file_size:
-                print(f'SPLITTING BY FILE SIZE: {os.path.getsize(file.name)} bytes > {max_file_size} limit')
-                objs = []
-                os.makedirs('./tmpsplitdir/', exist_ok = True)
-                subprocess.run(["split", "-C", f"{max_file_size}", file.name, './tmpsplitdir/'])
-                print(f'>>> files created in split: {len([file for file in os.listdir("./tmpsplitdir/")])}')
-                for subfile in os.listdir('./tmpsplitdir/'):
-                    batch_id = api_call(os.path.join('./tmpsplitdir/', subfile), prompt = prompt_name)
-                    batches.append(batch_id)
-                    os.remove(os.path.join('./tmpsplitdir/', subfile))
-                os.rmdir('./tmpsplitdir/')
-            else:
-                print('NO SPLIT NEEDED')
-                batch_id = api_call(file.name, prompt = prompt_name)
-                batches.append(batch_id)
+            file.writelines(lines[start:end])
+            file.flush()
+            batch_id = api_call(file.name, prompt = prompt_name)
+            batches.append(batch_id)
+            print(f'  Submitted batch chunk {b + 1} with {end - start} requests ({sum(request_tokens[start:end])} tokens)')
 
     return batches
 
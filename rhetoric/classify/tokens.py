@@ -0,0 +1,93 @@
+'''
+Token accounting for classification requests
+
+- `encoder(model)`: the tiktoken encoding for a model, loaded once per process (loading it is the slow part)
+- `count_tokens(texts)`: token counts for a whole batch of texts at once (tiktoken's threaded `encode_ordinary_batch`)
+- `request_tokens(user_messages, system_prompt)`: roughly what each chat request's prompt costs against the batch api's enqueued-token limit
+- `report(data)`: a per-source histogram of request sizes, to see a batch's token spend (and its outliers) before it's submitted
+- `pack(...)`: split requests into batch files by request count, bytes, *and* tokens
+'''
+# Python Standard Library
+import os, functools
+
+# External Dependencies
+import numpy as np
+import pandas as pd
+import tiktoken
+
+default_model = 'gpt-4o'
+message_overhead = 3 # <-- tokens each chat message costs on top of its content (role, separators)
+reply_priming = 3 # <-- every reply is primed with <|start|>assistant<|message|>
+buckets = [0, 64, 128, 256, 512, 1024, 2048, 4096, 8192, np.inf]
+
+
+@functools.lru_cache(maxsize = None)
+def encoder(model = default_model):
+    return tiktoken.encoding_for_model(model)
+
+
+def count_tokens(texts, model = default_model, num_threads = os.cpu_count() or 1):
+    '''
+    Token counts for a batch of texts (in the same order); anything that isn't a string (None, NaN) counts as 0. Special tokens (e.g. "<|endoftext|>" in a tweet) are counted as plain text, which is how the api sees them.
+    '''
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    enc = encoder(model)
+    if num_threads <= 1: # <-- the batch api's thread pool only pays off with cores to spread over
+        return [len(enc.encode_ordinary(text)) for text in texts]
+    return [len(tokens) for tokens in enc.encode_ordinary_batch(texts, num_threads = num_threads)]
+
+
+def request_tokens(user_messages, system_prompt = '', model = default_model):
+    '''
+    Prompt tokens for each of a batch of chat requests (a system prompt + one user message each)
+    '''
+    system_tokens = count_tokens([system_prompt], model)[0] + message_overhead if system_prompt else 0
+    return [system_tokens + tokens + message_overhead + reply_priming for tokens in count_tokens(user_messages, model)]
+
+
+def report(data, tokens = 'tokens', by = 'source'):
+    '''
+    Print a histogram of request sizes (from the `tokens` column) per `by` value (e.g. source); returns the summary table
+    '''
+    groups = data.groupby(by) if by in data else [('all', data)]
+    summary = []
+    for name, group in groups:
+        counts = group[tokens]
+        summary.append({
+            by: name,
+            'requests': len(counts),
+            'tokens': int(counts.sum()),
+            'mean': round(counts.mean(), 1),
+            'p50': int(counts.quantile(.5)),
+            'p90': int(counts.quantile(.9)),
+            'p99': int(counts.quantile(.99)),
+            'max': int(counts.max()),
+            **pd.cut(counts, buckets, right = False).value_counts(sort = False).rename(lambda bucket: f'<{bucket.right:g}' if np.isfinite(bucket.right) else f'{bucket.left:g}+').to_dict(),
+        })
+    summary = pd.DataFrame(summary)
+    print(summary.to_string(index = False))
+    print(f'\ttotal: {int(data[tokens].sum()):,} tokens over {len(data):,} requests')
+    return summary
+
+
+def pack(sizes, tokens, max_requests = 50000, max_bytes = 209715200, max_tokens = None):
+    '''
+    Split requests (in order) into as few consecutive batches as fit every limit: `max_requests` requests, `max_bytes` bytes (`sizes`: each request's json line, in bytes), and `max_tokens` tokens (`tokens`: each request's prompt tokens; None for no limit)
+
+    Returns a list of (start, end) slices. A single request over a limit still gets a batch of its own (there's nothing smaller to send).
+    '''
+    slices, start, batch_bytes, batch_tokens = [], 0, 0, 0
+    for i, (size, n) in enumerate(zip(sizes, tokens)):
+        full = (
+            (i - start >= max_requests)
+            or (batch_bytes + size > max_bytes)
+            or ((max_tokens is not None) and (batch_tokens + n > max_tokens))
+        )
+        if full and (i > start):
+            slices.append((start, i))
+            start, batch_bytes, batch_tokens = i, 0, 0
+        batch_bytes += size
+        batch_tokens += n
+    if start < len(sizes):
+        slices.append((start, len(sizes)))
+    return slices
@@ -0,0 +1,111 @@
+'''
+Per-source high-water marks for the insert stage (the `classifications_watermarks` table: `source`, `max_source_id`, `updated_at`), and the rows they've passed over without chunking (the `classifications_pending` table: `source`, `source_id`)
+
+- `read(dbx)`: {source: highest source id chunked so far}
+- `advance(tx, records)`: raise each source's mark to the highest `source_id` in a batch of classifications records, hold the rows the mark moves past that still have no chunks (e.g. no text yet), and release the held rows that are in the batch; call it in the transaction that inserts them, so a mark is never ahead of what's actually in `classifications`
+- `hold(tx, source, low, high)`: add a source's unchunked rows with ids in (`low`, `high`] to the held rows
+- `pending_query(source)`: the ids of a source's held rows, as a subquery; see insert_performance.missing_items
+- `init(dbx)`: create `classifications_pending` if it isn't there, holding the rows the marks have already passed (once); the insert scripts (and init.py) call it first
+- `rebuild(tx, source, since, confirmed)`: delete a source's chunks dated `since` or later, so they get chunked again (e.g. after changing `text.cleaners`); without `confirmed`, only count them. The chunks' classifications (paid-for llm output) go with them, and have to be classified again
+- `first_id(mark, first_recent_id)`: the id a run starts reading a source from
+
+The insert scripts only read source rows past a source's mark, the last `lookback` of dates, and the held rows: the source tables have no updated-at column, and some rows only get their text after they're inserted (statements are scraped later, some with no date), so a row below the mark may still be new. Reads past the mark start at `first_id` (an index seek on id), and held rows are looked up by id, so a run costs about as much as the rows since then plus the ones still waiting for text, not the whole table.
+'''
+# Python Standard Library
+import datetime
+
+# External Dependencies
+import sqlalchemy as sql
+
+table_name = 'classifications_watermarks'
+pending_table_name = 'classifications_pending'
+lookback = datetime.timedelta(weeks = 1) # <-- how far back (by date) to keep looking for rows below the mark that are still unchunked
+
+
+def init(dbx):
+    '''
+    Create `classifications_pending` if it isn't there yet, holding every row the marks have already passed without chunking (a scan of each source up to its mark, but only this once)
+    '''
+    if pending_table_name in dbx.tables:
+        return
+    table = dbx.create_table(pending_table_name, primary_id = 'id', primary_type = dbx.types.integer, primary_increment = True)
+    table.create_column('source', dbx.types.string(50))
+    table.create_column('source_id', dbx.types.integer)
+    table.create_index(['source', 'source_id'])
+
+    marks = read(dbx) if table_name in dbx.tables else {}
+    with dbx as tx:
+        for source, mark in marks.items():
+            hold(tx, source, None, mark)
+    print(f'{pending_table_name}: holding ' + ', '.join(f'{dbx[pending_table_name].count(source = source)} {source}' for source in marks) + ' rows the watermarks passed without chunking')
+
+
+def read(dbx):
+    return {row['source']: row['max_source_id'] for row in dbx[table_name].all()}
+
+
+def advance(tx, records):
+    marks, ids = {}, {}
+    for record in records:
+        marks[record['source']] = max(marks.get(record['source'], 0), int(record['source_id']))
+        ids.setdefault(record['source'], set()).add(int(record['source_id']))
+
+    table = tx[table_name]
+    for source, max_source_id in marks.items():
+        current = table.find_one(source = source)
+        if (current is None) or (current['max_source_id'] < max_source_id):
+            hold(tx, source, None if current is None else current['max_source_id'], max_source_id)
+            table.upsert({'source': source, 'max_source_id': max_source_id, 'updated_at': datetime.datetime.now()}, ['source'])
+
+    # held rows that are chunked now (late text picked up) aren't waiting anymore
+    for source, source_ids in ids.items():
+        tx[pending_table_name].delete(source = source, source_id = sorted(source_ids))
+
+
+def hold(tx, source, low, high):
+    '''
+    Hold `source`'s rows with ids in (`low`, `high`] (`low` None: from the start) that have no chunks yet, so later runs look at them again once the mark is past them
+    '''
+    items = sql.table(source, sql.column('id', sql.Integer))
+    classifications = sql.table('classifications', sql.column('source'), sql.column('source_id', sql.Integer))
+    pending = sql.table(pending_table_name, sql.column('source'), sql.column('source_id', sql.Integer))
+    passed = (
+        sql.select(sql.literal(source), items.c.id)
+        .where(
+            items.c.id <= high,
+            sql.true() if low is None else (items.c.id > low), # <-- a range on id; only a source's first mark (or init.py) looks at the whole table
+            ~sql.exists().where(classifications.c.source == source, classifications.c.source_id == items.c.id),
+            ~sql.exists().where(pending.c.source == source, pending.c.source_id == items.c.id),
+        )
+    )
+    tx.executable.execute(pending.insert().from_select(['source', 'source_id'], passed))
+
+
+def pending_query(source):
+    '''
+    The ids of `source`'s held rows, as a subquery (e.g. `items.c.id.in_(pending_query(source))`)
+    '''
+    pending = sql.table(pending_table_name, sql.column('source'), sql.column('source_id', sql.Integer))
+    return sql.select(pending.c.source_id).where(pending.c.source == source)
+
+
+def first_id(mark, first_recent_id):
+    '''
+    The lowest source id that can be new: the first past the `mark`, or `first_recent_id` (the first dated within the lookback), whichever is lower; None if there's neither (nothing to read)
+    '''
+    ids = [i for i in (None if mark is None else mark + 1, first_recent_id) if i is not None]
+    return min(ids) if ids else None
+
+
+def rebuild(tx, source, since, confirmed = False):
+    '''
+    Delete `source`'s chunks dated `since` or later (if `confirmed`; otherwise a dry run); returns how many there are
+    '''
+    chunks = tx['classifications'].count(source = source, date = {'>=': since})
+    if confirmed:
+        tx['classifications'].delete(source = source, date = {'>=': since})
+    return chunks
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
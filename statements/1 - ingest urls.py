@@ -1,4 +1,4 @@
-import subprocess, json, urllib.request, sys, io, os, json, datetime, time
+import subprocess, json, urllib.request, sys, io, os, json, datetime, time, argparse
 
 import dotenv
 import ibis; from ibis import _
@@ -12,11 +12,18 @@ import ingestion_utils
 dotenv.load_dotenv('../env')
 dotenv.load_dotenv(os.environ['PATH_TO_SECRETS'])
 
+parser = argparse.ArgumentParser(description = "Collect new press release urls from officials' press pages")
+parser.add_argument('--browsers', type = int, default = 4, help = 'number of officials to crawl at once (one headless browser each); default: 4')
+parser.add_argument('--domain-interval', type = float, default = 5, help = 'minimum seconds between page loads on the same domain; default: 5')
+parser.add_argument('--batch-size', type = int, default = 25, help = 'officials per db write (params, logs and urls in one transaction); default: 25')
+args = parser.parse_args()
+
 ## Logging
 log = ingestion_utils.DualLogger()
 
 ## DB Credentials
 db_uri = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
+ingestion_utils.init(db_uri)
 conn = ibis.mysql.connect(host = os.environ['DB_HOST'], user = os.environ['DB_USER'], password = os.environ['DB_PASSWORD'], database = 'elite')
 
 officials = conn.table('officials').filter([_.level == 'national', _.active == 1])
@@ -33,20 +40,24 @@ officials_w_params = (
     .replace({np.nan: None})
 )
 
+# What we already have for every official (max date, stored urls), in one go
+state = ingestion_utils.load_scrape_state(conn, officials_w_params['bioguide_id'])
+
 conn.disconnect()
 
 # # # # # # # #
 # RUN
 # # # # # # # #
-for o, official in officials_w_params.iterrows():
-# for o, official in officials_w_params.iloc[3:10].iterrows():
-   
-    log.start() # <-- captures stdout (but also prints to screen)
-    
+limiter = ingestion_utils.DomainLimiter(interval = args.domain_interval) # <-- shared by every browser (several officials' pages can live on the same domain)
+writer = ingestion_utils.ScrapeWriter(db_uri, batch_size = args.batch_size)
+
+def scrape(official, page):
+    log.start() # <-- captures stdout (but also prints to screen); per thread, so concurrent crawls don't mix their logs
+
     # Run Ingestor
     # - - - - - - - - - - - - - - - - - - - - -
     try:
-        urls, error, error_text = ingestion_utils.ingest_new_urls_from_press_page(official, db_uri)    
+        urls, error, error_text = ingestion_utils.ingest_new_urls_from_press_page(official, db_uri, page = page, limiter = limiter, state = state[official.bioguide_id], writer = writer)
     except Exception as e:
         print(f'\tEntire pipeline failed with: {e}')
         urls = None
@@ -56,31 +67,35 @@ for o, official in officials_w_params.iterrows():
     # Clean Up And Logging
     # - - - - - - - - - - - - - - - - - - - - -
     print('\tURL Collection Finished. Cleaning up...')
+    output = log.finish() # <-- collects stdout
+    return urls, error, error_text, output
 
 
-    print('\t\t\tSaving logging info to params table')
-    output = log.finish() # <-- collects stdout
-    dbx = dataset.connect(db_uri)
-    dbx['statements_scrape_params'].update(
+officials = (official for o, official in officials_w_params.iterrows())
+# officials = (official for o, official in officials_w_params.iloc[3:10].iterrows())
+for official, result, exception in ingestion_utils.CrawlerPool(size = args.browsers).map(scrape, officials):
+
+    if exception is not None: # <-- the browser itself failed (e.g. crashed before the crawl started)
+        print(f'\tEntire pipeline failed with: {exception}')
+        result = (None, 1, exception, None)
+    urls, error, error_text, output = result
+
+    print(f'\t\t\tSaving logging info to params table ({official.bioguide_id})')
+    writer.update_params(
         {
             'bioguide_id': official.bioguide_id,
             'last_run_error': error,
-            'last_run_error_text': error_text,
+            'last_run_error_text': str(error_text) if error_text is not None else None,
             'last_run_output': output,
-        },
-        'bioguide_id'
+        }
     )
-    dbx.engine.dispose(); dbx.close()
 
     if error == 1:
         print('\t\t\tError Detected. Saving output and will NOT push urls to statements table.')
     else:
         print(f'\t\t\tNo Errors Detected. Assuming everything went correctly and pushing {urls.shape[0]} urls to database.')
-        dbx = dataset.connect(db_uri)
-        dbx['statements'].upsert_many(
-            urls.to_dict(orient = 'records'),
-            'url'
-        )
-        dbx.engine.dispose(); dbx.close()
+        writer.add_urls(urls.to_dict(orient = 'records'))
+    writer.finish_official() # <-- writes every --batch-size officials
     print('=== Scrape Complete ===')
 
+writer.flush()
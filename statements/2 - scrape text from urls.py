@@ -1,19 +1,24 @@
-import subprocess, json, urllib.request, sys, io, os, json, datetime, time, random
+import subprocess, json, urllib.request, sys, io, os, json, datetime, time, random, argparse
 
 import dotenv
 import ibis; from ibis import _
 import pandas as pd
 import dataset
 import numpy as np 
-import trafilatura  # Modern web scraping library with built-in handling
-from tenacity import retry, stop_after_attempt, wait_exponential
 
-import util
+import scraper
 
 # setup
 dotenv.load_dotenv('../env')
 dotenv.load_dotenv(os.environ['PATH_TO_SECRETS'])
 
+parser = argparse.ArgumentParser(description = 'Scrape the article text of press releases we have urls for')
+parser.add_argument('--workers', type = int, default = 32, help = 'number of sites to scrape at once; default: 32')
+parser.add_argument('--min-delay', type = float, default = 5, help = 'minimum seconds between two requests to the same site; default: 5')
+parser.add_argument('--max-delay', type = float, default = 15, help = 'maximum seconds between two requests to the same site; default: 15')
+parser.add_argument('--batch-size', type = int, default = 100, help = 'scraped articles per db write; default: 100')
+args = parser.parse_args()
+
 ## DB Credentials
 db_uri = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
 conn = ibis.mysql.connect(
@@ -32,46 +37,31 @@ unscraped_press_releases = (
     .execute()
 )
 
-## Function to Scrape Article Body with Automatic Retries
-@retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=2, max=10))
-def scrape_article_body(url):
-    """Scrape the article body from a given URL using Trafilatura."""
-    downloaded = trafilatura.fetch_url(url)
-
-    if downloaded:
-        extracted = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
-        return extracted.strip() if extracted else None
-    
-    return None  # If failed
-
-## Process Each Press Release
-for index, row in unscraped_press_releases.iterrows():
-    url = row["url"]
-    print(f"Scraping: {url}")
-
-    try:
-        article_body = scrape_article_body(url)
-        
-        if article_body:
-            print(f"✅ Successfully scraped {url}")
+conn.disconnect()
 
-            # Update database: Mark as scraped + store content
-            dbx = dataset.connect(db_uri)
-            dbx['statements'].upsert(
-                {
-                    'url': url,
-                    'content_has_been_scraped': 1,
-                    'text': article_body,
-                },
-                'url'
-            )
-            dbx.engine.dispose(); dbx.close()
+## Process Each Press Release (sites concurrently; one at a time, politely, within a site)
+dbx = dataset.connect(db_uri)
+batch, scraped, failed = [], 0, 0
+for url, article_body, error in scraper.scrape(unscraped_press_releases['url'], workers = args.workers, delay = (args.min_delay, args.max_delay)):
 
-        else:
-            print(f"❌ Failed to scrape {url}")
+    if error is not None:
+        print(f"⚠️ Error scraping {url}: {error}")
+        failed += 1
+    elif article_body:
+        print(f"✅ Successfully scraped {url}")
+        batch.append({'url': url, 'text': article_body})
+    else:
+        print(f"❌ Failed to scrape {url}")
+        failed += 1
 
-    except Exception as e:
-        print(f"⚠️ Error scraping {url}: {e}")
+    # Update database: Mark as scraped + store content
+    if len(batch) >= args.batch_size:
+        scraper.write_scraped(dbx, batch)
+        scraped += len(batch); batch = []
 
+if batch:
+    scraper.write_scraped(dbx, batch)
+    scraped += len(batch)
+dbx.engine.dispose(); dbx.close()
 
-    time.sleep(random.uniform(5, 15))
+print(f'\tscraped: {scraped} | failed: {failed}')
@@ -1,4 +1,4 @@
-import os, sys, io, time
+import os, sys, io, re, json, time, datetime, threading, queue, contextlib, contextvars
 from urllib.parse import urljoin, urlparse
 import concurrent.futures
 from functools import wraps
@@ -11,6 +11,7 @@ import ibis; from ibis import _
 import requests
 from bs4 import BeautifulSoup
 from lxml import etree
+import lxml.html
 from playwright.sync_api import sync_playwright
 from scrapegraphai.graphs import SmartScraperGraph
 
@@ -76,22 +77,33 @@ def retry_on_failure(max_attempts=3):
 
 class DualLogger:
     def __init__(self):
-        """Initialize logger with a buffer and preserve original stdout."""
-        self.log_buffer = None
+        """Initialize logger and preserve original stdout. Each thread gets its own buffer, so officials being crawled at the same time (see CrawlerPool) keep separate logs."""
+        self.log_buffer = contextvars.ContextVar('log_buffer', default = None)  # <-- per thread (and carried into helper threads started with contextvars.copy_context().run)
         self.terminal = sys.stdout  # Store original stdout
+        self.capturing = 0
+        self.lock = threading.Lock()
 
     def start(self):
-        """Start capturing print statements while still displaying them on screen."""
-        self.log_buffer = io.StringIO()
-        sys.stdout = self  # Redirect stdout to this class
+        """Start capturing print statements (from this thread) while still displaying them on screen."""
+        if self.log_buffer.get() is not None:  # <-- already capturing here (e.g. the last run didn't reach finish()); just start a fresh buffer
+            self.log_buffer.set(io.StringIO())
+            return
+        self.log_buffer.set(io.StringIO())
+        with self.lock:
+            self.capturing += 1
+            sys.stdout = self  # Redirect stdout to this class
 
     def finish(self):
-        """Stop capturing and return the log content."""
-        if self.log_buffer:
-            sys.stdout = self.terminal  # Restore original stdout
-            log_content = self.log_buffer.getvalue() if self.log_buffer else ""
-            self.log_buffer.close()
-            self.log_buffer = None  # Reset buffer
+        """Stop capturing (for this thread) and return the log content."""
+        log_buffer = self.log_buffer.get()
+        if log_buffer:
+            self.log_buffer.set(None)  # Reset buffer
+            with self.lock:
+                self.capturing -= 1
+                if self.capturing == 0:
+                    sys.stdout = self.terminal  # Restore original stdout once nobody is capturing
+            log_content = log_buffer.getvalue()
+            log_buffer.close()
             return log_content  # Return captured text
         else:
             return None
@@ -100,14 +112,101 @@ class DualLogger:
     def write(self, message):
         """Write output to both terminal and log buffer."""
         self.terminal.write(message)  # Print to screen
-        if self.log_buffer:
-            self.log_buffer.write(message)  # Save to buffer
+        log_buffer = self.log_buffer.get()
+        if log_buffer:
+            log_buffer.write(message)  # Save to buffer
 
     def flush(self):
         """Ensure compatibility with stdout flushing."""
         self.terminal.flush()
-        if self.log_buffer:
-            self.log_buffer.flush()
+        log_buffer = self.log_buffer.get()
+        if log_buffer:
+            log_buffer.flush()
+
+
+
+class DomainLimiter:
+    """
+    Per-domain politeness limit (shared across threads): requests to the same domain are started at least `interval` seconds apart.
+    """
+    def __init__(self, interval = 5):
+        self.interval = interval
+        self.next_call = {}
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def request(self, url):
+        domain = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            next_call = self.next_call.get(domain, now)
+            delay = next_call - now
+            self.next_call[domain] = max(now, next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+        yield
+
+
+
+class CrawlerPool:
+    """
+    A few long-lived headless browsers for crawling officials' press pages concurrently.
+
+    Each browser (and its context) belongs to one worker thread for the life of the pool, since playwright's sync api can't be shared across threads; officials are handed out to whichever worker is free and each gets a fresh page. A browser that crashes is relaunched for the worker's next official.
+    """
+    def __init__(self, size = 4, headless = True):
+        self.size = size
+        self.headless = headless
+
+    def worker(self, fn, tasks, results):
+        with sync_playwright() as p:
+            browser = None
+            while True:
+                item = tasks.get()
+                if item is None:
+                    break
+
+                page = None
+                try:
+                    if (browser is None) or (not browser.is_connected()):
+                        browser = None
+                        launched = p.chromium.launch(headless = self.headless)
+                        try:
+                            context = launched.new_context()
+                        except Exception:
+                            try: launched.close()
+                            except Exception: pass
+                            raise  # <-- browser stays None, so the next official launches a fresh one
+                        browser = launched
+                    page = context.new_page()
+                    results.put((item, fn(item, page), None))
+                except Exception as e:  # <-- one official failing (or crashing the browser) doesn't take down the others
+                    results.put((item, None, e))
+                finally:
+                    if page is not None:
+                        try: page.close()
+                        except Exception: pass
+
+            if browser is not None:
+                try: browser.close()
+                except Exception: pass
+
+    def map(self, fn, items):
+        """
+        Run `fn(item, page)` for every item, `size` at a time; yields `(item, result, exception)` as each one finishes (in whatever order they finish)
+        """
+        items = list(items)
+        tasks, results = queue.Queue(), queue.Queue()
+        for item in items: tasks.put(item)
+        workers = [threading.Thread(target = self.worker, args = (fn, tasks, results), daemon = True) for _ in range(min(self.size, len(items)))]
+        for worker in workers:
+            tasks.put(None)  # <-- one stop signal per worker, after all the work
+            worker.start()
+
+        for _ in items:
+            yield results.get()
+        for worker in workers:
+            worker.join()
 
 
 
@@ -124,23 +223,71 @@ def make_url_absolute(base_url, url):
 
 
 
+class URLValidator:
+    """
+    Checks whether urls resolve, remembering the answer for `ttl` seconds (shared across threads).
+
+    Each check is a HEAD request (just the status, not the page), falling back to a GET (streamed, so the body isn't downloaded) for sites that don't answer HEAD properly; requests go through one pooled session, `workers` at a time in check_all. Urls we already have in `statements` can be `remember`ed as valid, so they're never requested at all.
+    """
+    def __init__(self, ttl = 24 * 60 * 60, workers = 8, timeout = 10):
+        self.ttl = ttl
+        self.workers = workers
+        self.timeout = timeout
+        self.results = {}  # <-- url: (valid, time checked)
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize = workers))
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize = workers))
+
+    def cached(self, url):
+        with self.lock:
+            valid, checked = self.results.get(url, (None, 0))
+        return valid if time.monotonic() - checked < self.ttl else None
+
+    def remember(self, urls, valid = True):
+        now = time.monotonic()
+        with self.lock:
+            self.results.update((url, (valid, now)) for url in urls)
+
+    def request(self, url, timeout):
+        try:
+            response = self.session.head(url, timeout = timeout, allow_redirects = True)
+            if response.status_code < 400:  # A valid response is usually in the 200-399 range
+                return True
+            with self.session.get(url, timeout = timeout, stream = True) as response:  # <-- plenty of sites 403/404/405 a HEAD but serve the page
+                return response.status_code < 400
+        except requests.exceptions.RequestException:
+            return None  # <-- couldn't tell (timeout, connection reset, ...); not worth remembering
+
+    def check(self, url, timeout = None):
+        valid = self.cached(url)
+        if valid is None:
+            valid = self.request(url, timeout or self.timeout)
+            if valid is not None:
+                self.remember([url], valid)
+        return bool(valid)
+
+    def check_all(self, urls):
+        """Check many urls at once; returns a list of bools (in the same order)."""
+        urls = list(urls)
+        with concurrent.futures.ThreadPoolExecutor(max_workers = self.workers) as executor:
+            return list(executor.map(self.check, urls))
+
+url_validator = URLValidator()
+
+
 def check_if_url_valid(url, timeout=10):
     """
-    Checks if a URL is valid by making an HTTP request.
+    Checks if a URL is valid (see URLValidator; answers are cached).
     
     Parameters:
         url (str): The URL to check.
-        timeout (int): Request timeout in seconds (default is 5s).
+        timeout (int): Request timeout in seconds (default is 10s).
 
     Returns:
         bool: True if the URL is valid, False otherwise.
     """
-    try:
-        response = requests.get(url, timeout=timeout)
-        # A valid response is usually in the 200-399 range
-        return response.status_code < 400
-    except requests.exceptions.RequestException:
-        return False
+    return url_validator.check(url, timeout = timeout)
 
 
 
@@ -153,6 +300,15 @@ def is_valid_xpath(xpath):
 
 
 
+def init(db_uri):
+    """
+    Make sure the `statements_scrape_params` columns added by these scripts exist, since it's read (and written) before anything would otherwise create them
+    """
+    with dataset.connect(db_uri) as dbx:
+        dbx['statements_scrape_params'].create_column('item_selector', dbx.types.text)  # <-- json; see learn_item_selector
+
+
+
 def update(data, on_column, table, db_uri):
     dbx = dataset.connect(db_uri)
     dbx[table].update(
@@ -163,18 +319,113 @@ def update(data, on_column, table, db_uri):
 
 
 
-@retry_on_failure(max_attempts=3)
-def get_press_release_url(official):
-    press_release_url = (
+def load_scrape_state(conn, bioguide_ids, window = 30):
+    """
+    What ingest_new_urls_from_press_page needs to know about each official's existing statements, for all of them at once (two grouped queries, instead of a connection per official):
+
+        {bioguide_id: {'max_date': latest statement date (NaT if none), 'known_urls': {urls we've stored dated within `window` days of it}}}
+
+    Pagination stops at the first page holding a url we already have, which (since pages go newest first, and a run picks up where the last one ended) is one from around the official's max date; older urls aren't needed, and statements are upserted on url anyway.
+    """
+    bioguide_ids = list(bioguide_ids)
+    statements = conn.table('statements')
+    max_dates = (
+        statements
+        .filter(_.bioguide_id.isin(bioguide_ids))
+        .group_by('bioguide_id')
+        .aggregate(max_date = _.date.max())
+    )
+    recent = (
+        statements
+        .filter(_.bioguide_id.isin(bioguide_ids))  # <-- (so the join only sees these officials' rows)
+        .join(max_dates, 'bioguide_id')
+        .filter(_.date >= _.max_date - ibis.interval(days = window))
+        .select('bioguide_id', 'url')
+        .execute()
+    )
+    max_dates = max_dates.execute()
+
+    state = {bioguide_id: {'max_date': pd.NaT, 'known_urls': set()} for bioguide_id in bioguide_ids}
+    for bioguide_id, max_date in zip(max_dates['bioguide_id'], pd.to_datetime(max_dates['max_date'])):
+        state[bioguide_id]['max_date'] = max_date.date() if pd.notna(max_date) else pd.NaT
+    for bioguide_id, group in recent.groupby('bioguide_id'):
+        state[bioguide_id]['known_urls'] = set(group['url'])
+    return state
+
+
+
+class ScrapeWriter:
+    """
+    Collects officials' results (`statements_scrape_params` updates, and new `statements` rows) from any thread, and writes them `batch_size` officials at a time: one connection and one transaction per batch.
+    """
+    def __init__(self, db_uri, batch_size = 25):
+        self.db_uri = db_uri
+        self.batch_size = batch_size
+        self.params = {}  # <-- bioguide_id: {column: value}; an official's updates are merged into one row
+        self.urls = []
+        self.officials = 0
+        self.lock = threading.Lock()
+
+    def update_params(self, row):
+        row = dict(row)
+        with self.lock:
+            self.params.setdefault(row['bioguide_id'], {}).update(row)
+
+    def add_urls(self, rows):
+        with self.lock:
+            self.urls.extend(rows)
+
+    def finish_official(self):
+        """Count an official as done; flushes if that fills a batch."""
+        with self.lock:
+            self.officials += 1
+            full = self.officials >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            params, urls = list(self.params.values()), self.urls
+            self.params, self.urls, self.officials = {}, [], 0
+        if not (params or urls):
+            return
+
+        dbx = dataset.connect(self.db_uri)
+        with dbx as tx:
+            for row in params:
+                tx['statements_scrape_params'].update(row, ['bioguide_id'])
+            if urls:
+                tx['statements'].upsert_many(urls, ['url'])
+        dbx.engine.dispose(); dbx.close()
+        print(f'\tSaved {len(params)} officials\' scrape params and {len(urls)} urls')
+
+
+
+def run_press_release_url_graph(source, config):
+    """Helper function to run SmartScraperGraph (which loads the page itself) in a separate thread"""
+    return (
         SmartScraperGraph(
-            source = official.government_website,
-            config = graph_config,
+            source = source,
+            config = config,
             prompt = """You are looking at the website of a federal legislator in Congress. Somewhere on this home page, you'll find the url for the press release page (may be referred to as public statements, press, press releases, etc). Return the url for the press releases page.""",
         )
         .run()
         ['content']
     )
 
+@retry_on_failure(max_attempts=3)
+def get_press_release_url(official):
+
+    # Use a separate thread to avoid Playwright event loop conflict (this runs inside a CrawlerPool worker's browser)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        future = executor.submit(
+            contextvars.copy_context().run,  # <-- so anything it prints still lands in this official's log
+            run_press_release_url_graph,
+            official.government_website,
+            graph_config,
+        )
+        press_release_url = future.result()
+
     if check_if_url_valid(press_release_url):
         return press_release_url
 
@@ -182,7 +433,6 @@ def get_press_release_url(official):
 
 def run_smart_scraper_graph(source, config):
     """Helper function to run SmartScraperGraph in a separate thread"""
-    with open("test.html",'w') as file: file.write(extract_visible_html(source))
     return (
         SmartScraperGraph(
             source = extract_visible_html(source),
@@ -203,6 +453,7 @@ def get_next_page_selector(official, source):
     # Use a separate thread to avoid Playwright event loop conflict
     with concurrent.futures.ThreadPoolExecutor() as executor:
         future = executor.submit(
+            contextvars.copy_context().run,  # <-- so anything it prints still lands in this official's log
             run_smart_scraper_graph, 
             source, 
             graph_config,
@@ -242,7 +493,7 @@ def get_all_press_releases_on_page(official, source):
     )
 
     # Check if **all** URLs are valid
-    if all(check_if_url_valid(url) for url in urls['url']):
+    if all(url_validator.check_all(urls['url'])):
         return urls
     else:
         print("\t\t❌ One or more invalid URLs found. Returning None.")
@@ -250,7 +501,170 @@ def get_all_press_releases_on_page(official, source):
 
 
 
-def ingest_new_urls_from_press_page(official, db_uri):
+# Item Selectors
+# - - - - - - - - - - - - - - - - - - - - -
+# Most press release pages are built from a handful of CMS templates, so once the llm has read an official's page we can usually find the markup its urls came from (e.g. `//div[contains(concat(" ", normalize-space(@class), " "), " views-row ")]` holding `./h3/a`) and read later pages ourselves with lxml. These item selectors are stored as json in `statements_scrape_params.item_selector` (next to next_page_selector).
+
+re_date = re.compile(
+    r'(?P<month_name>(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4})'
+    r'|(?P<iso>\d{4}-\d{2}-\d{2})'
+    r'|(?P<numeric>(?<!\d)\d{1,2}[/.]\d{1,2}[/.](?:\d{4}|\d{2})(?!\d))'
+)
+
+def parse_date(text):
+    """First date (e.g. 'March 5, 2025', 'Mar. 5, 2025', '2025-03-05', '3/5/2025', '03.05.25') in a piece of text, or None."""
+    for match in re_date.finditer(text):
+        if match.group('month_name'):
+            value = re.sub(r'\.?\s+', ' ', match.group('month_name').replace(',', ''))
+            month, day, year = value.split(' ')
+            formats, value = ['%b %d %Y'], f'{month[:3]} {day} {year}'
+        elif match.group('iso'):
+            formats, value = ['%Y-%m-%d'], match.group('iso')
+        else:
+            formats, value = ['%m/%d/%Y', '%m/%d/%y'], match.group('numeric').replace('.', '/')  # <-- us sites: month first
+        for format in formats:
+            try: return datetime.datetime.strptime(value, format).date()
+            except ValueError: pass
+    return None
+
+
+def item_date(item):
+    for time_element in item.iter('time'):
+        date = parse_date(time_element.get('datetime') or '')
+        if date: return date
+    return parse_date(' '.join(item.text_content().split()))
+
+
+def xpath_literal(value):
+    """`value` as an xpath string literal; xpath 1.0 has no escapes, so a value with both kinds of quotes is built with concat()"""
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    return 'concat(' + ", '\"', ".join(f'"{part}"' for part in value.split('"')) + ')'
+
+
+def class_tests(classes):
+    return ''.join(f'[contains(concat(" ", normalize-space(@class), " "), {xpath_literal(f" {c} ")})]' for c in sorted(classes))
+
+
+def extract_with_selector(source, item_selector, base_url):
+    """Read the (url, date) of every press release on a page with an item selector (as made by learn_item_selector); no llm involved."""
+    selector = json.loads(item_selector)
+    rows = []
+    for item in lxml.html.fromstring(source).xpath(selector['item']):
+        links = [link for link in item.xpath(selector['link']) if (link.get('href') or '').strip()]
+        if links:
+            rows.append({'url': make_url_absolute(base_url, links[0].get('href').strip()), 'date': item_date(item)})
+    return pd.DataFrame(rows, columns = ['url', 'date']).drop_duplicates(subset = ['url'])
+
+
+def learn_item_selector(source, urls, base_url):
+    """
+    Work out an item selector that reproduces what the llm found on this page (`urls`: its url/date dataframe); returns it as json, or None if there's no consistent markup that gives exactly the same urls and dates
+    """
+    wanted = set(urls['url'])
+    if len(wanted) < 2:
+        return None
+    tree = lxml.html.fromstring(source)
+    link_url = lambda link: make_url_absolute(base_url, (link.get('href') or '').strip())
+
+    anchors = {}
+    for link in tree.iter('a'):
+        if link_url(link) in wanted:
+            anchors.setdefault(link_url(link), link)
+    if set(anchors) != wanted:
+        return None
+
+    # Each press release's container: its link's biggest ancestor that holds no other press release's link
+    containers, paths = [], set()
+    for url, link in anchors.items():
+        item = link
+        while (item.getparent() is not None) and ({link_url(a) for a in item.getparent().iter('a')} & wanted) <= {url}:
+            item = item.getparent()
+        containers.append(item)
+
+        path, element = [], link  # <-- the link's position within its container, e.g. ./h3/a
+        while element is not item:
+            path.append(element.tag)
+            element = element.getparent()
+        paths.add('./' + '/'.join(reversed(path)) if path else '.')
+
+    if len({item.tag for item in containers}) != 1:
+        return None
+    classes = set.intersection(*[set((item.get('class') or '').split()) for item in containers])
+    if classes:
+        item_xpath = f'//{containers[0].tag}{class_tests(classes)}'
+    else:  # <-- e.g. <ul class="press-list"><li>...</li></ul> or <table class="recordList"><tbody><tr>...: anchor on the nearest (common) ancestor with a class instead
+        ancestors = containers
+        for _ in range(3):
+            ancestors = [ancestor.getparent() for ancestor in ancestors]
+            if any(ancestor is None for ancestor in ancestors) or (len({ancestor.tag for ancestor in ancestors}) != 1):
+                return None
+            ancestor_classes = set.intersection(*[set((ancestor.get('class') or '').split()) for ancestor in ancestors])
+            if ancestor_classes:
+                break
+        else:
+            return None
+        item_xpath = f'//{ancestors[0].tag}{class_tests(ancestor_classes)}//{containers[0].tag}'
+
+    item_selector = json.dumps({'item': item_xpath, 'link': paths.pop() if len(paths) == 1 else './/a'})
+
+    # Only keep it if it reads the page the way the llm did
+    found = extract_with_selector(source, item_selector, base_url)
+    if set(found['url']) != wanted:
+        return None
+    llm_dates = dict(zip(urls['url'], urls['date']))
+    if any(pd.notna(llm_dates[url]) and (llm_dates[url] != date) for url, date in zip(found['url'], found['date'])):
+        return None
+    return item_selector
+
+
+def get_press_releases_on_page(official, source, previous_urls = None):
+    """
+    The press releases (url, date, bioguide_id, party) on a page: read with the official's item selector if we've learned one, otherwise (or if it comes up empty, finds no dates, or just finds the previous page again) by the llm, learning an item selector from its answer.
+
+    Returns (urls, learned); `learned` is True when official.item_selector was (re)learned and should be saved once the run succeeds.
+    """
+    if pd.notna(official.get('item_selector')):
+        try:
+            urls = extract_with_selector(source, official.item_selector, official.press_release_url)
+        except (ValueError, KeyError, etree.XPathError) as e:  # <-- a stored selector that's broken (bad json or xpath) just means asking the llm again
+            print(f'\t\tItem selector failed ({e}); falling back to llm')
+            urls = pd.DataFrame(columns = ['url', 'date'])
+        if urls.empty or urls['date'].isna().all():
+            print('\t\tItem selector found nothing (or no dates); falling back to llm')
+        elif (previous_urls is not None) and (set(urls['url']) == set(previous_urls)):
+            print('\t\tItem selector found the previous page again; falling back to llm')
+        else:
+            print(f'\t\tRead {urls.shape[0]} press releases with item selector')
+            urls['bioguide_id'] = official.bioguide_id
+            urls['party'] = official.party
+            return urls, False
+
+    urls = get_all_press_releases_on_page(official, source = source)
+    learned = False
+    if (urls is not None) and (not urls.empty):
+        item_selector = learn_item_selector(source, urls, official.press_release_url)
+        if item_selector:
+            print(f'\t\tLearned item selector: {item_selector}')
+            official['item_selector'] = item_selector
+            learned = True
+    return urls, learned
+
+
+
+def ingest_new_urls_from_press_page(official, db_uri, page = None, limiter = None, state = None, writer = None):
+    """
+    Collect the urls (and dates) of an official's new press releases, paginating back until we reach ones we already have
+
+    - page: a playwright page to crawl with (e.g. from a CrawlerPool); if None, a browser is launched just for this official
+    - limiter: a DomainLimiter shared with other crawls, so we don't hit one site too often
+    - state: the official's entry from load_scrape_state; if None, it's looked up here
+    - writer: a ScrapeWriter to hand updates to `statements_scrape_params` (found press release urls, selectors) to; if None, they're written straight away
+    """
+    limiter = limiter or DomainLimiter()
+    save_params = writer.update_params if writer else (lambda row: update(row, 'bioguide_id', 'statements_scrape_params', db_uri))
 
     print(f'Starting scrape for {official.first_name} {official.last_name} | {official.bioguide_id} | {official.government_website} | press release url: {official.press_release_url}')
 
@@ -263,11 +677,14 @@ def ingest_new_urls_from_press_page(official, db_uri):
 
 
     ## Get Last Date with Data
-    conn = ibis.mysql.connect(host = os.environ['DB_HOST'], user = os.environ['DB_USER'], password = os.environ['DB_PASSWORD'], database = 'elite')
-    statements = conn.table('statements')
-    max_date = statements.filter(_.bioguide_id == official.bioguide_id)['date'].max().execute().date()
+    if state is None:
+        conn = ibis.mysql.connect(host = os.environ['DB_HOST'], user = os.environ['DB_USER'], password = os.environ['DB_PASSWORD'], database = 'elite')
+        state = load_scrape_state(conn, [official.bioguide_id])[official.bioguide_id]
+        conn.disconnect()
+    max_date = state['max_date']
     print('MAX DATE:', max_date)
-    conn.disconnect()
+    known_urls = state['known_urls']  # <-- the ones around max_date; used to stop paginating, and to only return new urls
+    url_validator.remember(known_urls)  # <-- urls we've already stored don't need checking again
     # max_date = datetime.date.fromisoformat("2025-03-02")
     print(f'\tMax date from existing data: {max_date}')
 
@@ -288,13 +705,17 @@ def ingest_new_urls_from_press_page(official, db_uri):
     if official.press_release_url:
         print(f'\t--- collecting urls from press release page {official.press_release_url}')
 
-        ## Mount Browser
-        with sync_playwright() as p:
+        ## Mount Browser (unless we've been handed a page)
+        with contextlib.ExitStack() as stack:
 
-            browser = p.chromium.launch(headless=True)  # Set headless=True to run in the background
-            page = browser.new_page()
+            if page is None:
+                p = stack.enter_context(sync_playwright())
+                browser = p.chromium.launch(headless=True)  # Set headless=True to run in the background
+                stack.callback(browser.close)
+                page = browser.new_page()
 
-            page.goto(official.press_release_url)
+            with limiter.request(official.press_release_url):
+                page.goto(official.press_release_url)
             page.wait_for_load_state('networkidle')
 
             page_content = page.content()
@@ -302,17 +723,14 @@ def ingest_new_urls_from_press_page(official, db_uri):
 
             ## Collect the First Page
             print('\tCollecting First Page of Press Releases')
-            urls = (
-                get_all_press_releases_on_page(
-                    official, 
-                    source = page_content
-                )
-            )
+            urls, learned_item_selector = get_press_releases_on_page(official, source = page_content)
 
             if (urls is not None) and (not urls.empty):
 
                 # assume succes
-                if update_press_release_url: update(official[['press_release_url','bioguide_id']], 'bioguide_id', 'statements_scrape_params', db_uri)
+                if update_press_release_url: save_params(official[['press_release_url','bioguide_id']])
+                if learned_item_selector: save_params(official[['item_selector','bioguide_id']])
+                page_urls = urls['url']
 
                 # sort urls
                 urls = urls.sort_values(by=['date','url'], ascending=[True,True])
@@ -323,8 +741,6 @@ def ingest_new_urls_from_press_page(official, db_uri):
 
             print(f'\tFirst page collected successfully; found {urls.shape[0]} urls from range {urls["date"].dropna().min()} -to- {urls["date"].max()}')
 
-            print(urls)
-            exit()
             # Begin Pagination
             # - - - - - - - - - - - - - - - - - - - - -
             print('\t=== Starting Pagination Loop')
@@ -332,14 +748,16 @@ def ingest_new_urls_from_press_page(official, db_uri):
                 print(f'\t\tIteration {i} | Current Page {page.url}')
 
                 # Finish: 
+                if known_urls.intersection(page_urls): # <-- we've reached press releases we already have; everything newer than them is on the pages we've read
+                    print(f'\tFinished. Page has {len(known_urls.intersection(page_urls))} urls we already have')
+                    break
                 print(f'\tChecking if minimum date ({urls["date"].dropna().min()}) is below max date ({max_date})')
-                if pd.notna(max_date): 
-                    if urls["date"].dropna().min() < max_date: # <-- NOTE! MAKE SURE THIS IS ALWAYS < max_date. We have to make sure that we're pulling up to the day _before_ the max date (which will have some overlap with existing items), so that we dont have any gaps in coverage
-                        print(f'\tFinished. Minimum date ({urls["date"].dropna().min()}) is below max date ({max_date})')
-                        break
-                else:
+                if pd.isna(max_date):
                     print("max_date is NaT; something went wrong. ending")
                     break
+                if urls["date"].dropna().min() < max_date: # <-- NOTE! MAKE SURE THIS IS ALWAYS < max_date. We have to make sure that we're pulling up to the day _before_ the max date (which will have some overlap with existing items), so that we dont have any gaps in coverage
+                    print(f'\tFinished. Minimum date ({urls["date"].dropna().min()}) is below max date ({max_date})')
+                    break
 
                 # Continue:
                 else:
@@ -395,7 +813,8 @@ def ingest_new_urls_from_press_page(official, db_uri):
                                 button.scroll_into_view_if_needed()
                                 button.focus()
                                 button.hover()
-                                button.click()
+                                with limiter.request(page.url):
+                                    button.click()
                                 print(f'\t\t\tButton click event dispatched successfully; but we\'ll determine if it actually worked by checking the next round of urls')
                                 break
                             except Exception as e:
@@ -411,10 +830,7 @@ def ingest_new_urls_from_press_page(official, db_uri):
                         # with open('content-1.html', 'w') as file: file.write(page_content)
 
                         print('\t\tPulling (hopefully) new urls')
-                        new_urls = get_all_press_releases_on_page(
-                            official, 
-                            source = page_content
-                        )
+                        new_urls, learned_item_selector = get_press_releases_on_page(official, source = page_content, previous_urls = page_urls)
 
                         if (new_urls is not None) and (not new_urls.empty):
                             new_urls = new_urls.sort_values(by=['date','url'], ascending=[True,True])
@@ -430,7 +846,9 @@ def ingest_new_urls_from_press_page(official, db_uri):
                             # If success:
                             else:
                                 print('\t\t\tNew URLs are different from previous urls; Assuming the button click was successful')
-                                if update_next_page_selector: update(official[['next_page_selector','bioguide_id']], 'bioguide_id', 'statements_scrape_params', db_uri)
+                                if update_next_page_selector: save_params(official[['next_page_selector','bioguide_id']])
+                                if learned_item_selector: save_params(official[['item_selector','bioguide_id']])
+                                page_urls = new_urls['url']
 
                         # If Fail:
                         else:
@@ -449,8 +867,12 @@ def ingest_new_urls_from_press_page(official, db_uri):
                         urls['date'] = pd.to_datetime(urls['date'], errors='coerce').dt.date
                         print(f'\t\tURLs now range from {urls["date"].dropna().min()} -to- {urls["date"].max()}; continuing loop')
 
-            print('\t=== Pagination Loop finished; closing browser')
-            browser.close()
+            print('\t=== Pagination Loop finished')
+
+            # Only hand back what we don't already have
+            if urls is not None:
+                urls = urls[~urls['url'].isin(known_urls)]
+                print(f'\t{urls.shape[0]} new urls')
 
     return urls, error, error_text
 
@@ -0,0 +1,112 @@
+'''
+---
+title: Statements Article Scraper
+---
+
+Pulls the article text out of press release pages (with trafilatura), many sites at once but politely
+
+- urls are grouped by host, and each host's urls are fetched one after another with a random `delay` (seconds) between them, exactly like the old serial loop did for every url; different hosts (hundreds of `.house.gov`/`.senate.gov` sites) are scraped concurrently, `workers` at a time, busiest hosts first
+- every worker thread keeps one `requests.Session`, so connections to a host are reused across its urls
+- results are yielded as they come in, so the caller can write them to the db in batches (see write_scraped)
+
+usage:
+    for url, body, error in scrape(urls, workers = 32): ...
+    python stub_press.py --port 8000  # <-- a local stand-in for the press release sites, to try it against
+'''
+# Python Standard Library
+import time, random, queue, threading, collections
+import urllib.parse
+import concurrent.futures
+
+# External Resources
+import requests
+import sqlalchemy as sql
+import trafilatura  # Modern web scraping library with built-in handling
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+retry_statuses = {429, 500, 502, 503, 504}
+user_agent = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+
+class TransientError(Exception):
+    pass
+
+
+def group_by_host(urls):
+    '''
+    {host: [urls]}, with the hosts that have the most urls first (they take longest, so they should start first)
+    '''
+    hosts = collections.defaultdict(list)
+    for url in urls:
+        hosts[urllib.parse.urlsplit(url).netloc].append(url)
+    return dict(sorted(hosts.items(), key = lambda host: -len(host[1])))
+
+
+## Fetch with Automatic Retries (on connection errors and 429/5xx; a 404 isn't going to change)
+@retry(stop = stop_after_attempt(5), wait = wait_exponential(multiplier = 1, min = 2, max = 10), retry = retry_if_exception_type((requests.ConnectionError, requests.Timeout, TransientError)), reraise = True)
+def fetch(session, url, timeout = 30):
+    '''
+    The page's raw bytes (not `response.text`: requests falls back to ISO-8859-1 when a page doesn't send a charset, which garbles utf-8 pages; trafilatura works the encoding out itself, as it did with fetch_url)
+    '''
+    response = session.get(url, timeout = timeout)
+    if response.status_code in retry_statuses:
+        raise TransientError(f'{response.status_code} from {url}')
+    if not response.ok:
+        return None
+    return response.content
+
+
+def extract_article_body(html):
+    """Pull the article body out of a page (html as bytes or str) using Trafilatura."""
+    extracted = trafilatura.extract(html, include_comments = False, include_tables = False)
+    return extracted.strip() if extracted else None
+
+
+def scrape_host(session, urls, results, delay = (5, 15)):
+    '''
+    Scrape one host's urls in order, waiting `random.uniform(*delay)` seconds between them; puts (url, body, exception) on `results` for each
+    '''
+    for i, url in enumerate(urls):
+        if i:
+            time.sleep(random.uniform(*delay))
+        try:
+            html = fetch(session, url)
+            results.put((url, extract_article_body(html) if html else None, None))
+        except Exception as e:
+            results.put((url, None, e))
+
+
+def scrape(urls, workers = 32, delay = (5, 15)):
+    '''
+    Scrape every url, yielding (url, article body or None, exception or None) in the order they finish
+    '''
+    hosts = group_by_host(urls)
+    results = queue.Queue()
+    local = threading.local()
+
+    def run(host_urls):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.headers['User-Agent'] = user_agent
+        scrape_host(local.session, host_urls, results, delay)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        futures = [executor.submit(run, host_urls) for host_urls in hosts.values()]
+        for _ in range(sum(len(host_urls) for host_urls in hosts.values())):
+            yield results.get()
+        for future in futures:
+            future.result()
+
+
+def write_scraped(dbx, rows):
+    '''
+    Store a batch of scraped article bodies (`[{'url': ..., 'text': ...}, ...]`) on their `statements` rows, and mark them scraped; one statement, one transaction
+    '''
+    table = dbx['statements'].table
+    stmt = (
+        sql.update(table)
+        .where(table.c.url == sql.bindparam('_url'))
+        .values(text = sql.bindparam('_text'), content_has_been_scraped = 1)
+    )
+    with dbx.engine.begin() as conn: # <-- pooled connection
+        conn.execute(stmt, [{'_url': row['url'], '_text': row['text']} for row in rows])
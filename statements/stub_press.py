@@ -0,0 +1,80 @@
+'''
+---
+title: Local Stand-in for Press Release Sites
+---
+
+Serves made-up press release pages at any `/<path>` (the same path always gets the same article), so `2 - scrape text from urls.py`'s scraper can be run (and timed) without touching real sites
+
+Every `127.0.0.x` address reaches it (on linux), and the scraper groups urls by host, so `http://127.0.0.1:8000/...`, `http://127.0.0.2:8000/...`, ... act as separate sites. `/_stats` reports, per host, how many requests it got and the shortest gap between two of them (to check the scraper's politeness delay).
+
+`--fail-rate` answers that fraction of requests with a 503 (and `--delay` slows every response down), to exercise retries and concurrency.
+
+usage:
+    python stub_press.py [--port 8000] [--fail-rate 0.1] [--delay 0.05]
+'''
+# Python Standard Library
+import json, time, random, hashlib, argparse, threading
+import http.server
+
+words = 'the congressman announced today that the bill will deliver funding for local families veterans small businesses and infrastructure across the district'.split()
+
+
+def article(path):
+    rng = random.Random(hashlib.sha256(path.encode('utf-8')).hexdigest())
+    title = ' '.join(rng.choice(words) for _ in range(8)).capitalize()
+    paragraphs = ''.join(f'<p>{" ".join(rng.choice(words) for _ in range(40)).capitalize()}.</p>' for _ in range(rng.randint(3, 8)))
+    return (
+        f'<html><head><title>{title}</title></head><body>'
+        '<nav><a href="/">Home</a> <a href="/press">Press Releases</a></nav>'
+        f'<article><h1>{title}</h1>{paragraphs}</article>'
+        '<footer>Washington, DC Office</footer></body></html>'
+    )
+
+
+class StubPressHandler(http.server.BaseHTTPRequestHandler):
+    fail_rate = 0
+    delay = 0
+    stats = {}
+    lock = threading.Lock()
+
+    def send(self, status, body, content_type = 'text/html; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/_stats':
+            with self.lock:
+                return self.send(200, json.dumps(self.stats).encode('utf-8'), 'application/json')
+
+        host, now = self.headers.get('Host', ''), time.monotonic()
+        with self.lock:
+            stat = self.stats.setdefault(host, {'requests': 0, 'min_gap': None, 'last': None})
+            if stat['last'] is not None:
+                gap = now - stat['last']
+                stat['min_gap'] = gap if stat['min_gap'] is None else min(stat['min_gap'], gap)
+            stat['requests'] += 1; stat['last'] = now
+
+        time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            return self.send(503, b'try again')
+        self.send(200, article(self.path).encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Serve made-up press release pages')
+    parser.add_argument('--port', type = int, default = 8000)
+    parser.add_argument('--fail-rate', type = float, default = 0, help = 'fraction of requests to answer with a 503')
+    parser.add_argument('--delay', type = float, default = 0, help = 'seconds to wait before every response')
+    args = parser.parse_args()
+
+    StubPressHandler.fail_rate = args.fail_rate
+    StubPressHandler.delay = args.delay
+    server = http.server.ThreadingHTTPServer(('0.0.0.0', args.port), StubPressHandler)
+    print(f'serving press releases on http://127.0.0.x:{args.port}')
+    server.serve_forever()
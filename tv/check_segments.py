@@ -0,0 +1,53 @@
+'''
+---
+title: Caption Segmentation Checks
+---
+
+Runs `ingestor.tokenize_speaker_segments` (and `segment_shows`) over small hand-written captions, including the malformed ones real transcripts have (blank lines at the end or start of a file, lines without a timestamp), and checks the segments that come out; exits non-zero if any are wrong
+
+usage: python check_segments.py
+'''
+# Python Standard Library
+import io, sys
+
+# Internal Resources
+import ingestor
+
+show = (
+    '[000:00:01;000] >> GOOD EVENING, I AM THE ANCHOR.\n'
+    '[000:00:03;500] TONIGHT: THE SENATE VOTE.\n'
+    '[000:00:05;000] >> THANK YOU. THE VOTE WAS CLOSE.\n'
+    '[000:00:09;000] IT PASSED 51 TO 49.\n'
+)
+expected = [
+    ingestor.Segment(start = 1, end = 3, text = 'GOOD EVENING, I AM THE ANCHOR. TONIGHT: THE SENATE VOTE.', commercial = False),
+    ingestor.Segment(start = 5, end = 9, text = 'THANK YOU. THE VOTE WAS CLOSE. IT PASSED 51 TO 49.', commercial = False),
+]
+
+cases = {
+    'plain': (show, expected),
+    'ends in blank lines': (show + '\n\n', [expected[0], expected[1]._replace(text = expected[1].text + '  ')]),
+    'ends without a newline': (show.rstrip('\n'), expected),
+    'starts with blank lines': ('\n\n' + show, expected), # <-- the blank lines are a segment with no timestamp, so they're dropped
+    'untimestamped line mid-segment': (show.replace('[000:00:09;000] IT PASSED', 'garbled\n[000:00:09;000] IT PASSED'), [expected[0], expected[1]._replace(text = 'THANK YOU. THE VOTE WAS CLOSE.  IT PASSED 51 TO 49.')]),
+    'only blank lines': ('\n\n\n', []),
+    'empty': ('', []),
+}
+
+if __name__ == '__main__':
+    failed = False
+    for name, (captions, segments) in cases.items():
+        try:
+            result = list(ingestor.tokenize_speaker_segments(io.StringIO(captions)))
+            ok = result == segments
+        except Exception as e:
+            result, ok = repr(e), False
+        failed = failed or not ok
+        print(f'{name:<32} {"ok" if ok else f"FAILED: got {result}"}')
+
+    # one bad transcript can't take down a batch
+    table = ingestor.segment_shows([{'id': i, 'date': None, 'network': 'CNNW', 'show': name, 'text': captions} for i, (name, (captions, _)) in enumerate(cases.items())])
+    ok = len(table['tv_id']) == sum(len(segments) for captions, segments in cases.values())
+    failed = failed or not ok
+    print(f'{"segment_shows over all of them":<32} {"ok" if ok else "FAILED"}')
+    sys.exit(1 if failed else 0)
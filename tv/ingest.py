@@ -16,6 +16,14 @@ dotenv.load_dotenv(os.environ['PATH_TO_SECRETS'])
 # print(os.environ['IA_ACCESS_KEY'])# = 'YOUR_ACCESS_KEY'
 # os.environ['IA_SECRET_KEY']# = 'YOUR_SECRET_KEY'
 
+parser = argparse.ArgumentParser(description = 'Harvest tv closed-caption transcripts from the Internet Archive')
+parser.add_argument('--start-date', type = datetime.date.fromisoformat, default = None, help = 'first date to harvest (YYYY-MM-DD; default: a few days before the last date in the tv table)')
+parser.add_argument('--end-date', type = datetime.date.fromisoformat, default = datetime.datetime.now().date(), help = 'last date to harvest (YYYY-MM-DD; default: today)')
+parser.add_argument('--lookback-days', type = int, default = 3, help = 'how far before the last date in the tv table to start looking (archive.org posts some shows late); default: 3')
+parser.add_argument('--workers', type = int, default = 8, help = 'number of searches/downloads to run at once; default: 8')
+parser.add_argument('--archive-url', default = ingestor.archive_url, help = f'where to find archive.org (e.g. a stub_archive.py); default: {ingestor.archive_url}')
+args = parser.parse_args()
+
 ## Connect to DB
 db = f"{os.environ['DB_DIALECT']}://{os.environ['DB_USER']}:{urllib.parse.quote(os.environ['DB_PASSWORD'])}@localhost:{os.environ['DB_PORT']}/elite"
 
@@ -27,29 +35,15 @@ max_date = sql.select(sql.func.max(dbx[ingestor.tablename].table.c.date)).execut
 init_count = dbx[ingestor.tablename].count()
 dbx.engine.dispose(); dbx.close()
 
-if max_date: start_date = max_date + datetime.timedelta(days=1)
+# Shows are checkpointed by identifier, so we can safely look back over the last few days (shows we already have are skipped without being downloaded)
+if max_date: start_date = max_date - datetime.timedelta(days = args.lookback_days)
+if args.start_date: start_date = args.start_date
 
-end_date = datetime.datetime.now().date()
+end_date = args.end_date
 
 # Execute Harvester
-for d, day in enumerate(range((end_date - start_date).days)):
-    date = start_date + datetime.timedelta(days = day)
-    
-    print('collecting for:', date)
-
-
-    ingestor.ingest(date, date, db, None)
-
-    exit()
-    dbx = dataset.connect(db)
-    existing = dbx[ingestor.tablename].find_one(date = date)
-    dbx.engine.dispose(); dbx.close()
-
-    if existing:
-        print(f'Skipping {date} since there are already existing entries for that date')
-
-    else:
-        ingestor.ingest(date, date, db, None)
+print(f'collecting for: {start_date} -to- {end_date}')
+ingestor.ingest(start_date, end_date, db, None, workers = args.workers, base_url = args.archive_url)
 
 dbx = dataset.connect(db)
 end_count = dbx[ingestor.tablename].count()
@@ -1,15 +1,20 @@
 # Python Standard Library
-import os, json, datetime, tempfile, time, csv
+import os, io, json, datetime, tempfile, time, csv, threading, contextlib, itertools, collections
 import urllib
+import concurrent.futures
 
 # External Resources
 import dataset
-import requests
-import internetarchive # <-- api for getting the tv data
+import requests # <-- for archive.org's search and download endpoints (see request)
+import sqlalchemy as sql
+from sqlalchemy.dialects import mysql
 
 # Internal Resources
 
 tablename = 'tv'
+networks = ['CNNW', "MSNBCW", "FOXNEWSW"]
+archive_url = 'https://archive.org'
+retry_statuses = {429, 500, 502, 503, 504}
 
 def init(db):
     with dataset.connect(db) as dbx:
@@ -19,93 +24,303 @@ def init(db):
         table.create_column('text', dbx.types.text)
         table.create_column('network', dbx.types.text)
         table.create_column('show', dbx.types.text)
+        table.create_column('error', dbx.types.text)
+        table.create_column('identifier', dbx.types.string(150), unique = True, nullable = True) # <-- archive.org identifier (e.g. "CNNW_20221115_000000_Erin_Burnett_OutFront"); one row per show, and our checkpoint of what's been ingested
 
 
-def tokenize_speaker_segments(file_obj):
+class HostLimiter:
     '''
-    NOTE: We stopped using this in the most recent version; figured it's better to get the whole piece of data and then segment it later
+    Politeness limits per host (across threads): at most `concurrency` requests in flight to a host at once, started at least `interval` seconds apart
+    '''
+    def __init__(self, concurrency = 4, interval = 0.25):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def request(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = {'slots': threading.BoundedSemaphore(self.concurrency), 'next_call': time.monotonic()}
+            state = self.hosts[host]
+
+        with state['slots']:
+            with self.lock:
+                now = time.monotonic()
+                delay = state['next_call'] - now
+                state['next_call'] = max(now, state['next_call']) + self.interval
+            if delay > 0:
+                time.sleep(delay)
+            yield
+
+
+Segment = collections.namedtuple('Segment', ['start', 'end', 'text', 'commercial']) # <-- start/end: seconds since midnight (of the first and last caption line)
+
+
+def caption_seconds(line):
+    '''
+    Seconds since midnight for a caption line's `[0HH:MM:SS;fff]` timestamp (read at fixed offsets; no strptime)
+    '''
+    return int(line[2:4]) * 3600 + int(line[5:7]) * 60 + int(line[8:10])
+
+
+def has_timestamp(line):
+    return line[2:4].isdigit() and line[5:7].isdigit() and line[8:10].isdigit()
 
-    DESCRIPTION: Break closed captioning text into a list of segments (assuming consistent format of `[0HH:MM:SS;fff] >>`) <-- it will break if that format is broken
-    - also remove commercials (which are defined as any text with long blocks of whitespace)
+
+def tokenize_speaker_segments(lines, commercials = False):
+    '''
+    DESCRIPTION: Break closed captioning text into segments (assuming consistent format of `[0HH:MM:SS;fff] >>`) <-- it will break if that format is broken
+    - lines: any iterator of caption lines (an open file, io.StringIO(text), ...); it's consumed as it goes, so nothing but the current segment is held in memory
+    - yields a Segment (start, end, text, commercial) each time a segment closes
+    - commercials (which are defined as any text with long blocks of whitespace) are flagged as they're read, and left out unless `commercials = True`
+    - a segment's start/end come from its first/last line with a timestamp; lines without one (e.g. blank lines at the end of a file) are kept as text, and text with no timestamp at all (nothing to time it by) is dropped
 
     Cons of this approach: we lose a small amount of actual news text right before commercial breaks. however, this text is usually something along the lines of "we'll be right back", and also doesn't have any clear indicator of when they stop and when the commercial begins
     '''
-    segments = []
-    segment = {'commercial_lines_guess': 0, 'text': []}
-    for line in file_obj.readlines():
+    first = last = None
+    text, commercial_lines_guess = [], 0
+
+    def close():
+        start, end = caption_seconds(first), caption_seconds(last)
+        return Segment(
+            start = start,
+            end = start + (end - start) % 86400, # <-- a segment that runs past midnight ends the next day
+            text = '\n'.join(text).replace('>>> ', '').replace('>> ', '').replace('\n', ' '), # <-- sometimes the stopgap is >>> (which I think indicates -- albeit inconsistently -- that there's a new speaker); we want to remove >> and >>> (joined on newlines first, so neither can match across two lines)
+            commercial = commercial_lines_guess >= 3, # <-- if there's a lot of lines that we guess are commercials, dont add them to the list; here we could probaly even get away with < 2 or even 1 (worth testing)
+        )
+
+    for line in lines:
 
         # Check if we want to make a new segment (which seem to occur when >> are called)
         if line[16:18] == '>>':
+            if first is not None: # <-- we check if there's even any lines to parse, because the first line of the entire document can start with >>
+                segment = close()
+                if commercials or not segment.commercial:
+                    yield segment
+            first, text, commercial_lines_guess = None, [], 0
 
-            if (segment['commercial_lines_guess'] < 3) & (len(segment['text']) > 0): # if there's a lot of lines that we guess are commercials, dont add them to the list; here we could probaly even get away with < 2 or even 1 (worth testing) | we also check if there's even any lines to parse, because if the first line of the entire document starts with >>> it'll trigger this even condition if we don't check (and throw an error when we try to index the lines)
-                segment['start_time'] = datetime.datetime.strptime(segment['text'][0][1:10], '0%H:%M:%S') # <-- pull time from first line added
-                segment['end_time'] = datetime.datetime.strptime(segment['text'][-1][1:10], '0%H:%M:%S') # <-- pull time from last line added
-                segment['time_length_in_seconds'] = (segment['end_time'] - segment['start_time']).seconds # we honestly dont have to keep start time and end time in memory like this; once theyve hit "length" we're done with them. im keeping them because: (a) its not like it's that much memory; we'll be fine, and (b) we may want it in the future so good to remind ourselves that we have the option (it's also fun to print when debugging)
-                segment['text'] = ' '.join([segment_line[16:].replace('\n','').replace('>>> ','').replace('>> ','') for segment_line in segment['text']]) # <-- sometimes the stopgap is >>> (which I think indicates -- albeit inconsistently -- that there's a new speaker); we want to remove >> and >>>
-                segments.append(segment)
+        if has_timestamp(line):
+            if first is None:
+                first = line
+            last = line
+        text.append(line[16:].rstrip('\n'))
+        if line[16:20] == '    ': # <-- if there's 4 empty whitespaces after the time stamp, it's indicative that we're in a commercial (we can probably even get away with 2 spaces but 4 is just being careful)
+            commercial_lines_guess += 1
 
-            segment = {'commercial_lines_guess': 0, 'text': []} # <-- either way, make the new empty segment object
+    # the last segment runs to the end of the show
+    if first is not None:
+        segment = close()
+        if commercials or not segment.commercial:
+            yield segment
 
-        segment['text'].append(line)
-        if line[16:20] == '    ': # <-- if there's 4 empty whitespaces after the time stamp, it's indicative that we're in a commercial (we can probably even get away with 2 spaces but 4 is just being careful)
-            segment['commercial_lines_guess'] += 1
 
-        # Fun ways to watch what's going in (only do one at a time):
-        # print('Num Segments:', len(segments)); print('Commercial lines (guess):', segment['commercial_lines_guess']); print(line); print(' | '.join(segment['text'])); time.sleep(.1); os.system('clear')
-        # print('\n>>'.join([b['text'] for b in segments])); print(line); print('Num Segments:', len(segments)); print('Commercial lines (guess):', segment['commercial_lines_guess']); time.sleep(.1); os.system('clear')
-        # [print(s['start_time'].time(), '|', s['end_time'].time(), '|', s['time_length'], '|', s['text'][:100], '...') for s in segments]; print(line); print('Num Segments:', len(segments)); time.sleep(.1); os.system('clear')
-    return segments
+def segment_shows(shows, commercials = False):
+    '''
+    Segment a batch of shows (e.g. a day's rows from the `tv` table: dicts with `id`, `date`, `network`, `show`, and `text`) into one columnar table, ready for a bulk insert:
 
+        {'tv_id': [...], 'date': [...], 'network': [...], 'show': [...], 'segment': [...], 'start': [...], 'end': [...], 'text': [...], 'commercial': [...]}
 
-def ingest(start_date, end_date, db, logdb):
+    (`segment` numbers a show's segments from 0; e.g. `pandas.DataFrame(table)`, or `[dict(zip(table, row)) for row in zip(*table.values())]` for dataset's insert_many)
     '''
-    Ingest the Data
+    columns = ['tv_id', 'date', 'network', 'show', 'segment', 'start', 'end', 'text', 'commercial']
+    table = {column: [] for column in columns}
+    for show in shows:
+        if not show['text']:
+            continue
+        for i, segment in enumerate(tokenize_speaker_segments(io.StringIO(show['text']), commercials = commercials)):
+            for column, value in zip(columns, (show['id'], show['date'], show['network'], show['show'], i) + segment):
+                table[column].append(value)
+    return table
+
+
+def request(session, limiter, url, attempts = 5, backoff = 2, **kwargs):
     '''
-    for i in range((end_date - start_date).days + 1):
-        entries = []
-        date = start_date + datetime.timedelta(days = i)
-        networks = ['CNNW', "MSNBCW", "FOXNEWSW"]
+    GET `url` politely (see HostLimiter), retrying connection errors, timeouts, 429s, and 5xxs with exponential backoff (or as long as the server's Retry-After asks)
+    '''
+    for attempt in range(attempts):
+        try:
+            with limiter.request(url):
+                response = session.get(url, timeout = 60, **kwargs)
+            if response.status_code not in retry_statuses:
+                response.raise_for_status() # <-- anything else (e.g. a 404) won't get better by asking again
+                return response
+            error = requests.HTTPError(f'{response.status_code} for {response.url}', response = response)
+            retry_after = response.headers.get('Retry-After', '')
+            delay = int(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+            delay = backoff * 2 ** attempt
+        if attempt < attempts - 1:
+            time.sleep(delay)
+    raise error
+
+
+def search_identifiers(session, limiter, network, date, base_url = archive_url, rows = 500):
+    '''
+    Identifiers of every show (e.g. "CNNW_20221115_000000_Erin_Burnett_OutFront") archived for a network on a date
+    '''
+    search_query = f'collection:(TV-{network}) date:[{date}]' # <-- this is the format internetarchive is expecting; you can test it here: https://archive.org/advancedsearch.php#raw
+    identifiers = []
+    for page in itertools.count(1):
+        response = request(session, limiter, f'{base_url}/advancedsearch.php', params = {'q': search_query, 'fl[]': 'identifier', 'rows': rows, 'page': page, 'output': 'json'})
+        docs = response.json()['response']['docs']
+        identifiers += [doc['identifier'] for doc in docs]
+        if len(docs) < rows:
+            return identifiers
 
 
-        for network in networks: # <-- iterate through each network
-            search_query = f'collection:(TV-{network}) date:[{date}]' # <-- this is the format internetarchive is expecting; you can test it here: https://archive.org/advancedsearch.php#raw
+def captions_url(identifier, base_url = archive_url):
+    return f'{base_url}/download/{identifier}/{identifier}.cc5.txt' # <-- the show's "Closed Caption Text" file
 
 
-            for item in internetarchive.search_items(query = search_query): # <-- request list of closed-caption transcript identifiers for the network at the date
+def download_captions(session, limiter, identifier, base_url = archive_url):
+    '''
+    Download a show's closed captions straight into memory (nothing is written to disk); returns the text
+    '''
+    response = request(session, limiter, captions_url(identifier, base_url))
+    with io.TextIOWrapper(io.BytesIO(response.content), encoding = 'utf-8') as file: # <-- decoded (and newlines translated) just like reading the file back from disk was
+        return file.read()
+
+
+def fetch_show(session, limiter, date, network, identifier, base_url = archive_url):
+    '''
+    Download a show's transcript and turn it into a `tv` row (a failed download is recorded in `error` rather than raised)
+    '''
+    splitname = identifier.split('_') # example of what the identifier typically looks like: "CNNW_20221115_000000_Erin_Burnett_OutFront"
+    time = datetime.datetime.strptime(splitname[2], '%H%M00') # ignore microseconds
+    show = ' '.join(splitname[3:])
+
+    text, error = None, None
+    try:
+        text = download_captions(session, limiter, identifier, base_url = base_url) # <-- downloades transcripts for the particular show we're looking at
+    except Exception as e:
+        error = str(e)
+        print(f"FAILED FOR: {identifier} ::>> {e}")
+
+    return {
+        'date': date,
+        'text': text,
+        'network': network,
+        'show': show,
+        'time': time,
+        'error': error,
+        'identifier': identifier,
+    }
+
+
+def ingested_identifiers(dbx, identifiers):
+    '''
+    Which of these shows are already in the `tv` table (failed downloads don't count, so they get tried again)
+    '''
+    if not identifiers:
+        return set()
+    table = dbx[tablename].table
+    with dbx.engine.connect() as conn:
+        rows = conn.execute(sql.select(table.c.identifier).where(table.c.identifier.in_(identifiers), table.c.error.is_(None))).fetchall()
+    return set(row[0] for row in rows)
+
+
+def legacy_dates(dbx, start_date, end_date):
+    '''
+    Dates ingested before shows were checkpointed (their rows have no identifier, so there's nothing to diff against); these are left as they are
+    '''
+    table = dbx[tablename].table
+    with dbx.engine.connect() as conn:
+        rows = conn.execute(sql.select(table.c.date).distinct().where(table.c.date.between(start_date, end_date), table.c.identifier.is_(None))).fetchall()
+    return set(row[0] for row in rows)
+
+
+def write_shows(dbx, entries, max_bytes = 4 * 1024**2):
+    '''
+    Bulk write `tv` rows keyed on identifier: a show that's already there (i.e. a failed download being retried) gets overwritten rather than duplicated
+    - each multi-row INSERT holds as many shows as fit in `max_bytes` of transcript text (at least one), so a batch of long transcripts stays under mysql's max_allowed_packet (4 MB by default before 8.0); all of them go in one transaction
+    '''
+    table = dbx[tablename].table
+    def insert(conn, chunk):
+        stmt = mysql.insert(table).values(chunk)
+        conn.execute(stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in chunk[0] if column != 'identifier'}))
+
+    with dbx.engine.begin() as conn: # <-- pooled connection
+        chunk, size = [], 0
+        for entry in entries:
+            entry_size = len((entry['text'] or '').encode('utf-8')) + 1024 # <-- plus room for the other columns (and the statement itself)
+            if chunk and size + entry_size > max_bytes:
+                insert(conn, chunk)
+                chunk, size = [], 0
+            chunk.append(entry)
+            size += entry_size
+        if chunk:
+            insert(conn, chunk)
+
+
+def ingest(start_date, end_date, db, logdb, workers = 8, base_url = archive_url, limiter = None, batch_size = 100):
+    '''
+    Ingest the Data
+
+    - searches every network for every date, and downloads each show's transcript as soon as its search comes back; all of it through a pool of `workers` threads, kept polite per host by `limiter` (see HostLimiter), with at most 2 * `workers` searches/downloads submitted at once (downloads first)
+    - a search that still fails after its retries is logged and skipped (that network and date get searched again next run)
+    - shows already in the `tv` table (by identifier) aren't downloaded again, so re-running a range (after a crash, or to pick up shows archive.org posted late) only fetches what's missing
+    - transcripts are written to the db `batch_size` at a time, in the order they finish downloading (so memory holds one batch, not the whole range)
+    - base_url: where archive.org is (e.g. a local stand-in; see stub_archive.py)
+    '''
+    limiter = limiter or HostLimiter()
+    init(db) # <-- make sure the identifier column (and its unique key) exist, since we write to the table directly
 
-                with tempfile.TemporaryDirectory() as temp_dir: # <-- this directory gets deleted once the context is left
-                    temp_dir = '.tmp/'
+    dbx = dataset.connect(db)
+    skipped_dates = legacy_dates(dbx, start_date, end_date)
+    for date in sorted(skipped_dates):
+        print(f'Skipping {date} since it was ingested before shows were checkpointed')
+    dates = [start_date + datetime.timedelta(days = i) for i in range((end_date - start_date).days + 1)]
+    dates = [date for date in dates if date not in skipped_dates]
 
-                    splitname = item['identifier'].split('_') # example of what the identifier typically looks like: "CNNW_20221115_000000_Erin_Burnett_OutFront"
-                    time = datetime.datetime.strptime(splitname[2], '%H%M00') # ignore microseconds
-                    show = ' '.join(splitname[3:])
+    session = requests.Session()
+    session.mount(base_url, requests.adapters.HTTPAdapter(pool_maxsize = workers)) # <-- one pooled connection per worker
 
-                    filepath = os.path.join(temp_dir, item['identifier'], item['identifier'] + '.cc5.txt')
+    entries, queued = [], set()
+    def write(entries):
+        write_shows(dbx, entries)
+        print(f'\twrote {len(entries)} transcripts')
 
-                    error = None
+    searches = collections.deque((date, network) for date in dates for network in networks)
+    downloads = collections.deque() # <-- (date, network, identifier) of shows found but not yet downloading
+    running = {} # <-- future: (kind, date, network); only what's in flight, so nothing piles up over a long backfill
+    max_running = 2 * workers # <-- enough to keep every worker busy, but no more (or the pool's queue holds everything)
 
-                    try:
-                        internetarchive.download(item['identifier'], verbose = False, formats = 'Closed Caption Text', destdir = temp_dir) # <-- downloades transcripts for the particular show we're looking at
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        while searches or downloads or running:
+            # downloads first (they're what gets written), then searches while there's room and few shows waiting
+            while downloads and len(running) < max_running:
+                date, network, identifier = downloads.popleft()
+                running[executor.submit(fetch_show, session, limiter, date, network, identifier, base_url)] = ('download', date, network)
+            while searches and len(running) < max_running and len(downloads) < max_running:
+                date, network = searches.popleft()
+                running[executor.submit(search_identifiers, session, limiter, network, date, base_url)] = ('search', date, network)
 
-                        if os.path.exists(filepath):
-                            with open(filepath, 'r') as file:
-                                text = file.read()
-                    except Exception as e:
-                        error = str(e)
-                        print(f"FAILED FOR: {item['identifier']} ::>> {e}")
-                        text = None
+            finished, _ = concurrent.futures.wait(running, return_when = concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                kind, date, network = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e: # <-- one network/date failing (after retries) shouldn't stop the rest; nothing's written for it, so the next run searches it again
+                    print(f"FAILED TO {kind.upper()} FOR: {network} {date} ::>> {e}")
+                    continue
 
-                    print(text)
-                    exit()
-                    entries.append({
-                        'date': date,
-                        'text': text,
-                        'network': network,
-                        'show': show,
-                        'time': time,
-                        'error': error,
-                    })
+                if kind == 'search':
+                    done = ingested_identifiers(dbx, result)
+                    missing = [identifier for identifier in result if identifier not in done and identifier not in queued]
+                    queued.update(missing)
+                    print(f'\t{network} {date}: {len(result)} shows, {len(missing)} new')
+                    downloads.extend((date, network, identifier) for identifier in missing)
+                else:
+                    entries.append(result)
+                    if len(entries) >= batch_size:
+                        write(entries)
+                        entries = []
+        if entries:
+            write(entries)
 
-        dbx = dataset.connect(db)
-        dbx[tablename].insert_many(entries)
-        dbx.engine.dispose(); dbx.close()
+    session.close()
+    dbx.engine.dispose(); dbx.close()
@@ -0,0 +1,85 @@
+'''
+---
+title: Local Stand-in for archive.org
+---
+
+Serves a directory of closed-caption files (`<identifier>.cc5.txt`, e.g. `CNNW_20221115_000000_Erin_Burnett_OutFront.cc5.txt`) through the two archive.org endpoints the tv ingestor uses, so it can be run (and timed) without touching the real archive
+
+- `/advancedsearch.php?q=collection:(TV-<network>) date:[<YYYY-MM-DD>]&rows=..&page=..&output=json`: the identifiers for that network and date
+- `/download/<identifier>/<identifier>.cc5.txt`: the caption file
+
+`--fail-rate` answers that fraction of requests with a 503 (and `--delay` slows every response down), to exercise the ingestor's retries and concurrency.
+
+usage:
+    python stub_archive.py path/to/captions/ [--port 8000] [--fail-rate 0.1] [--delay 0.05]
+    python ingest.py --archive-url http://localhost:8000 --start-date 2022-11-15 --end-date 2022-11-16
+'''
+# Python Standard Library
+import os, re, json, time, random, argparse
+import urllib.parse
+import http.server
+
+re_search = re.compile(r'collection:\(TV-(?P<network>\w+)\) date:\[(?P<date>\d{4}-\d{2}-\d{2})\]')
+
+
+class StubArchiveHandler(http.server.BaseHTTPRequestHandler):
+    captions_dir = '.'
+    fail_rate = 0
+    delay = 0
+
+    def send(self, status, body, content_type = 'text/plain; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            return self.send(503, b'try again')
+
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == '/advancedsearch.php':
+            return self.search(urllib.parse.parse_qs(url.query))
+        if url.path.startswith('/download/'):
+            return self.download(os.path.basename(url.path))
+        self.send(404, b'not found')
+
+    def search(self, params):
+        match = re_search.fullmatch(params.get('q', [''])[0])
+        if match is None:
+            return self.send(400, b'unsupported query')
+        prefix = f"{match.group('network')}_{match.group('date').replace('-', '')}_"
+        identifiers = sorted(filename[:-len('.cc5.txt')] for filename in os.listdir(self.captions_dir) if filename.startswith(prefix) and filename.endswith('.cc5.txt'))
+
+        rows, page = int(params.get('rows', ['50'])[0]), int(params.get('page', ['1'])[0])
+        docs = [{'identifier': identifier} for identifier in identifiers[(page - 1) * rows:page * rows]]
+        body = json.dumps({'response': {'numFound': len(identifiers), 'start': (page - 1) * rows, 'docs': docs}})
+        self.send(200, body.encode('utf-8'), 'application/json')
+
+    def download(self, filename):
+        path = os.path.join(self.captions_dir, filename)
+        if not os.path.isfile(path):
+            return self.send(404, b'not found')
+        with open(path, 'rb') as file:
+            self.send(200, file.read())
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Serve local caption files as if they were archive.org')
+    parser.add_argument('captions_dir', help = 'directory of <identifier>.cc5.txt files')
+    parser.add_argument('--port', type = int, default = 8000)
+    parser.add_argument('--fail-rate', type = float, default = 0, help = 'fraction of requests to answer with a 503')
+    parser.add_argument('--delay', type = float, default = 0, help = 'seconds to wait before every response')
+    args = parser.parse_args()
+
+    StubArchiveHandler.captions_dir = args.captions_dir
+    StubArchiveHandler.fail_rate = args.fail_rate
+    StubArchiveHandler.delay = args.delay
+    server = http.server.ThreadingHTTPServer(('localhost', args.port), StubArchiveHandler)
+    print(f'serving {args.captions_dir} as archive.org on http://localhost:{args.port}')
+    server.serve_forever()